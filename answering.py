@@ -0,0 +1,123 @@
+import json
+import re
+import threading
+from typing import Callable, List, Optional
+
+from concurrency import run_concurrently
+from retrieval import DEFAULT_TOP_K, PassageIndex
+
+MAX_BATCH_SIZE = 10
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.MULTILINE)
+
+def format_batch_questions(questions: List[str]) -> str:
+    """Menyusun daftar pertanyaan bernomor untuk prompt jawaban batch."""
+    return "\n".join(f"{i}. {question}" for i, question in enumerate(questions, 1))
+
+def batch_answer_instructions(count: int) -> str:
+    """Instruksi format JSON yang harus diikuti model untuk jawaban batch."""
+    return (
+        f"Jawab ke-{count} pertanyaan di atas. Balas HANYA dengan JSON valid tanpa teks lain, dengan format:\n"
+        '{"answers": [{"id": 1, "answer": "..."}, {"id": 2, "answer": "..."}]}\n'
+        "Nilai id sama dengan nomor pertanyaan."
+    )
+
+def parse_batch_answers(content: Optional[str], count: int) -> List[Optional[str]]:
+    """Memetakan respons JSON jawaban batch kembali ke urutan pertanyaan.
+
+    Jawaban yang hilang, kosong atau formatnya rusak bernilai None agar bisa ditanyakan ulang.
+    """
+    answers: List[Optional[str]] = [None] * count
+    if not content:
+        return answers
+    text = _CODE_FENCE.sub("", content.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return answers
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return answers
+
+    items = data.get("answers", []) if isinstance(data, dict) else []
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            i = int(item.get("id")) - 1
+        except (TypeError, ValueError):
+            continue
+        answer = item.get("answer")
+        if 0 <= i < count and isinstance(answer, str) and answer.strip():
+            answers[i] = answer.strip()
+    return answers
+
+def answer_questions(
+    questions: List[str],
+    passage_index: PassageIndex,
+    answer_fn: Callable[[str, str], Optional[str]],
+    batch_answer_fn: Optional[Callable[[List[str], str], List[Optional[str]]]] = None,
+    top_k: int = DEFAULT_TOP_K,
+    batch_size: int = 1,
+    max_workers: int = 4,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    on_answer: Optional[Callable[[int, str], None]] = None,
+    on_token: Optional[Callable[[int, str], None]] = None,
+) -> List[Optional[str]]:
+    """Menjawab pertanyaan secara paralel, satu per permintaan atau beberapa sekaligus.
+
+    Dengan batch_size > 1, setiap kelompok pertanyaan dikirim dalam satu permintaan ke
+    batch_answer_fn dengan konteks gabungan passage yang relevan; pertanyaan yang jawabannya
+    hilang atau rusak ditanyakan ulang satu per satu lewat answer_fn. on_answer(indeks, jawaban)
+    dipanggil untuk setiap jawaban yang berhasil; jawaban yang gagal bernilai None.
+
+    Bila on_token diberikan, answer_fn dipanggil dengan argumen ketiga berupa callback streaming
+    dan on_token(indeks, teks_sejauh_ini) diteruskan untuk pertanyaan yang dijawab satu per satu.
+    """
+    total = len(questions)
+    results: List[Optional[str]] = [None] * total
+    answered = [0]
+    lock = threading.Lock()
+
+    def record(i: int, answer: Optional[str]):
+        with lock:
+            results[i] = answer
+            answered[0] += 1
+        if answer is not None and on_answer:
+            on_answer(i, answer)
+
+    def ask_single(i: int):
+        question = questions[i]
+        context = passage_index.context_for(question, top_k)
+        try:
+            if on_token is not None:
+                answer = answer_fn(question, context, lambda text: on_token(i, text))
+            else:
+                answer = answer_fn(question, context)
+        except Exception:
+            answer = None
+        record(i, answer)
+
+    def ask_batch(indices: List[int]):
+        batch = [questions[i] for i in indices]
+        answers: List[Optional[str]] = [None] * len(indices)
+        if len(indices) > 1 and batch_answer_fn is not None:
+            try:
+                answers = batch_answer_fn(batch, passage_index.context_for_many(batch, top_k))
+            except Exception:
+                pass
+        for i, answer in zip(indices, answers):
+            if answer is None:
+                ask_single(i)
+            else:
+                record(i, answer)
+
+    size = max(1, min(batch_size, MAX_BATCH_SIZE)) if batch_answer_fn is not None else 1
+    batches = [list(range(start, min(start + size, total))) for start in range(0, total, size)]
+    run_concurrently(
+        ask_batch,
+        batches,
+        max_workers=max_workers,
+        on_progress=(lambda done, count: on_progress(answered[0], total)) if on_progress else None
+    )
+    return results
@@ -0,0 +1,879 @@
+import streamlit as st
+import requests
+import os
+import pandas as pd
+import time
+from types import ModuleType
+from typing import Callable, List, Dict, Optional
+
+from answering import MAX_BATCH_SIZE, answer_questions
+from backends import DEFAULT_MODELS, LLM_STAGES, PROVIDERS, LLMRouter, build_router, required_providers
+from batch import DEFAULT_STAGE_WORKERS, parse_url_list, process_urls, run_url_job
+from checkpoints import CheckpointStore
+from chunking import DEFAULT_CHUNK_TOKENS, clean_in_chunks
+from corpus import get_corpus
+from dataset_writer import PREVIEW_ROWS, DatasetWriter, parquet_available
+from incremental import SectionDiff
+from jobs import ACTIVE_STATUSES, JOB_OUTPUT_DIR, get_job_queue, job_key
+from llm_cache import get_completion_cache
+from metrics import RunMetrics, preclean_summary, record_preclean, start_run, summary_rows, track_call
+from preclean import CLEAN_MODES, format_report, needs_llm_cleaning, preclean
+from question_dedup import DEFAULT_SIMILARITY_THRESHOLD, get_question_index
+from reporting import report_error, report_warning
+from retrieval import DEFAULT_TOP_K, RETRIEVAL_MODES, PassageIndex
+from scheduler import DEFAULT_LIMITS, configure_scheduler
+from scrape_cache import cached_scrape
+from streaming import throttle
+
+# UI Streamlit dan orkestrasi pipeline yang sama untuk semua entry point (main.py, llama.py).
+# Entry point hanya menyediakan PROVIDER (backend bawaan) dan fungsi prompt per tahap: clean_chunk,
+# generate_questions, get_ai_answer dan get_ai_answers_batch; modulnya diteruskan sebagai `app`.
+
+# Pengaturan yang ikut dicatat di metrik run agar hasil antar konfigurasi bisa dibandingkan
+RUN_CONFIG_KEYS = (
+    'temperature', 'max_concurrency', 'clean_chunk_tokens', 'clean_concurrency', 'retrieval_mode',
+    'retrieval_top_k', 'answer_batch_size', 'clean_mode', 'rate_limits', 'use_llm_cache',
+    'dedup_questions', 'dedup_threshold', 'dedup_history', 'incremental', 'stage_routes', 'hedge_requests'
+)
+
+# Parameter job yang hanya memengaruhi kecepatan, bukan hasil (seperti NON_OUTPUT_ARGS di cli.py);
+# tidak ikut kunci job dan namespace checkpoint agar hasil dan checkpoint bisa dipakai ulang
+NON_OUTPUT_PARAMS = (
+    'max_concurrency', 'clean_concurrency', 'rate_limits', 'hedge_requests', 'use_llm_cache', 'stage_workers'
+)
+
+def initialize_session_state(provider: str):
+    """Inisialisasi session state untuk menyimpan API keys dan pengaturan; provider adalah backend bawaan."""
+    # Inisialisasi API keys
+    if 'openai_api_key' not in st.session_state:
+        st.session_state.openai_api_key = ''
+    if 'together_api_key' not in st.session_state:
+        st.session_state.together_api_key = ''
+    if 'jina_api_key' not in st.session_state:
+        st.session_state.jina_api_key = ''
+    
+    # Inisialisasi pengaturan model
+    if 'temperature' not in st.session_state:
+        st.session_state.temperature = 0.7
+    if 'max_concurrency' not in st.session_state:
+        st.session_state.max_concurrency = 4
+    if 'stage_routes' not in st.session_state:
+        st.session_state.stage_routes = {stage: provider for stage in LLM_STAGES}
+    if 'hedge_requests' not in st.session_state:
+        st.session_state.hedge_requests = False
+    if 'use_llm_cache' not in st.session_state:
+        st.session_state.use_llm_cache = True
+    if 'scrape_ttl_hours' not in st.session_state:
+        st.session_state.scrape_ttl_hours = 24
+    if 'clean_chunk_tokens' not in st.session_state:
+        st.session_state.clean_chunk_tokens = DEFAULT_CHUNK_TOKENS
+    if 'clean_concurrency' not in st.session_state:
+        st.session_state.clean_concurrency = 4
+    if 'clean_mode' not in st.session_state:
+        st.session_state.clean_mode = 'llm'
+    if 'retrieval_mode' not in st.session_state:
+        st.session_state.retrieval_mode = 'full'
+    if 'retrieval_top_k' not in st.session_state:
+        st.session_state.retrieval_top_k = DEFAULT_TOP_K
+    if 'answer_batch_size' not in st.session_state:
+        st.session_state.answer_batch_size = 1
+    if 'rate_limits' not in st.session_state:
+        # [RPM, TPM] per provider; tiap provider punya scheduler dan batas akunnya sendiri
+        st.session_state.rate_limits = {name: list(DEFAULT_LIMITS[name]) for name in PROVIDERS}
+    if 'write_parquet' not in st.session_state:
+        st.session_state.write_parquet = False
+    if 'dedup_questions' not in st.session_state:
+        st.session_state.dedup_questions = True
+    if 'dedup_threshold' not in st.session_state:
+        st.session_state.dedup_threshold = DEFAULT_SIMILARITY_THRESHOLD
+    if 'dedup_history' not in st.session_state:
+        st.session_state.dedup_history = True
+    if 'incremental' not in st.session_state:
+        st.session_state.incremental = False
+    if 'last_run_metrics' not in st.session_state:
+        st.session_state.last_run_metrics = None
+    if 'last_result' not in st.session_state:
+        st.session_state.last_result = None
+    if 'use_job_queue' not in st.session_state:
+        st.session_state.use_job_queue = True
+    if 'active_job' not in st.session_state:
+        # Job yang dikirim sebelum halaman dimuat ulang atau koneksi terputus dipantau lagi
+        st.session_state.active_job = st.query_params.get("job")
+    if 'job_error' not in st.session_state:
+        st.session_state.job_error = None
+    
+    # Inisialisasi status proses
+    if 'processing_status' not in st.session_state:
+        st.session_state.processing_status = ''
+
+def llm_api_keys() -> Dict[str, str]:
+    """API key LLM per provider; provider tanpa key tidak bisa dipilih sebagai rute atau tujuan hedge."""
+    return {provider: st.session_state[f"{provider}_api_key"] for provider in PROVIDERS}
+
+def effective_scrape_ttl() -> float:
+    """TTL cache scraping untuk run ini; run incremental selalu memvalidasi ulang halaman."""
+    return 0 if st.session_state.incremental else st.session_state.scrape_ttl_hours
+
+def scrape_website(url: str, jina_api_key: str, ttl_hours: float = 24) -> str:
+    """Melakukan scraping website menggunakan Jina AI Reader API, dengan cache lokal ber-TTL."""
+    try:
+        with track_call("scrape", "jina") as call:
+            content, status = cached_scrape(url, jina_api_key, ttl_hours * 3600, stats=call)
+        if status == "stale":
+            report_warning("Jina AI Reader lambat atau gagal merespons. Menggunakan hasil scraping tersimpan sebelumnya.")
+        return content
+    except requests.exceptions.RequestException as e:
+        report_error(f"Error saat melakukan scraping website: {e}")
+        return ""
+
+def clean_data(app: ModuleType, text: str, llm: LLMRouter, temperature: float, chunk_tokens: int = DEFAULT_CHUNK_TOKENS, max_workers: int = 4, on_token: Optional[Callable[[str], None]] = None, mode: str = "llm",
+               on_report: Optional[Callable[[Dict], None]] = None) -> str:
+    """Membersihkan data hasil scraping: pra-pembersihan lokal, lalu (sesuai mode) LLM per potongan secara paralel.
+
+    on_report menerima laporan pra-pembersihan agar pemanggil tidak perlu menjalankan preclean lagi.
+    """
+    # Menu, gambar, tautan dan boilerplate dibuang lokal agar tidak ikut dibayar sebagai token input
+    text, report = preclean(text)
+    if on_report:
+        on_report(report)
+    use_llm = needs_llm_cleaning(report, mode)
+    record_preclean(report, llm_skipped=not use_llm)
+    if not use_llm:
+        return text
+    return clean_in_chunks(
+        text,
+        lambda chunk, on_chunk_token: app.clean_chunk(chunk, llm, temperature, on_chunk_token),
+        max_tokens=chunk_tokens,
+        max_workers=max_workers,
+        on_token=on_token
+    )
+
+def stage_functions(app: ModuleType, llm: LLMRouter, jina_api_key: str, scrape_ttl_hours: float, num_questions: int,
+                    temperature: float, chunk_tokens: int, clean_concurrency: int, clean_mode: str) -> Dict[str, Callable]:
+    """Fungsi per tahap untuk process_urls/run_url_job dengan prompt entry point app."""
+    return {
+        "scrape_fn": lambda url: scrape_website(url, jina_api_key, scrape_ttl_hours),
+        "clean_fn": lambda text: clean_data(app, text, llm, temperature, chunk_tokens, clean_concurrency, mode=clean_mode),
+        "questions_fn": lambda document: app.generate_questions(document, llm, num_questions, temperature),
+        "answer_fn": lambda question, document: app.get_ai_answer(question, document, llm, temperature),
+        "batch_answer_fn": lambda batch, document: app.get_ai_answers_batch(batch, document, llm, temperature),
+    }
+
+def show_downloads(paths: Dict[str, str], filename: str):
+    """Menampilkan tombol unduh untuk file hasil yang sudah selesai ditulis."""
+    if not os.path.exists(paths["csv"]) or not os.path.exists(paths["jsonl"]):
+        st.info("File hasil sudah tidak tersedia untuk diunduh.")
+        return
+    with open(paths["csv"], "rb") as f:
+        st.download_button(
+            "📥 Unduh Hasil (CSV)",
+            data=f,
+            file_name=f"{filename}.csv",
+            mime="text/csv",
+            help="Klik untuk mengunduh hasil dalam format CSV"
+        )
+    with open(paths["jsonl"], "rb") as f:
+        st.download_button(
+            "📥 Unduh Hasil (JSONL)",
+            data=f,
+            file_name=f"{filename}.jsonl",
+            mime="application/jsonl",
+            help="Satu record JSON per baris, siap dipakai untuk fine-tuning atau evaluasi"
+        )
+    if "parquet" in paths:
+        st.caption(f"Dataset Parquet disimpan di `{paths['parquet']}`")
+
+def show_run_metrics(run_metrics: RunMetrics):
+    """Menampilkan total dan persentil latensi, token dan biaya per tahap untuk satu run."""
+    summary = run_metrics.summary()
+    st.subheader("Metrik Run Terakhir")
+    st.caption(
+        f"{summary['duration']:.1f} detik · {summary['calls']} panggilan · {summary['retries']} retry · "
+        f"{summary['prompt_tokens'] + summary['completion_tokens']} token · ${summary['cost_usd']:.4f}"
+    )
+    if summary["preclean"]["pages"]:
+        st.caption(preclean_summary(summary))
+    if summary["stages"]:
+        st.dataframe(pd.DataFrame(summary_rows(summary)).set_index("Tahap"), use_container_width=True)
+    st.download_button(
+        "📊 Unduh Metrik (JSON)",
+        data=run_metrics.to_json(),
+        file_name=os.path.basename(run_metrics.default_path()),
+        mime="application/json",
+        key=f"metrics_{run_metrics.started_at}"
+    )
+
+def qa_markdown(i: int, question: str, answer: Optional[str]) -> str:
+    if answer is None:
+        answer = "_Gagal mendapatkan jawaban; tidak disimpan ke dataset._"
+    return f"**Q{i+1}: {question}**\n\nA{i+1}: {answer}\n\n---"
+
+def show_single_summary(result: Dict):
+    """Status akhir dan tombol unduh untuk hasil run satu URL."""
+    failed_count = sum(answer is None for answer in result["answers"])
+    if failed_count:
+        st.warning(f"{failed_count} pertanyaan gagal dijawab dan tidak disimpan.")
+    st.success("Proses selesai!")
+    show_downloads(result["paths"], result["filename"])
+
+def show_batch_result(result: Dict):
+    """Ringkasan, pratinjau dan tombol unduh untuk hasil run batch."""
+    st.success(f"Proses batch selesai! {result['count']} pasangan tanya-jawab dari {result['sources']} URL.")
+
+    if os.path.exists(result["paths"]["csv"]):
+        with st.expander("Lihat Hasil", expanded=True):
+            st.dataframe(pd.read_csv(result["paths"]["csv"], nrows=PREVIEW_ROWS), use_container_width=True)
+            if result["count"] > PREVIEW_ROWS:
+                st.caption(f"Menampilkan {PREVIEW_ROWS} dari {result['count']} baris. Unduh file untuk dataset lengkap.")
+
+    show_downloads(result["paths"], result["filename"])
+
+def show_last_result(result: Dict):
+    """Menggambar ulang hasil run terakhir dari session state tanpa memanggil API."""
+    if result["mode"] == "batch":
+        st.caption(f"Hasil run batch terakhir ({result['urls']} URL)")
+        show_batch_result(result)
+        return
+
+    st.caption(f"Hasil run terakhir untuk {result['url']}")
+    with st.expander("Lihat Teks Hasil Pembersihan"):
+        st.container(height=300).markdown(result["cleaned"])
+    with st.expander("Lihat Hasil", expanded=True):
+        for i, (question, answer) in enumerate(zip(result["questions"], result["answers"])):
+            st.markdown(qa_markdown(i, question, answer))
+    show_single_summary(result)
+
+def run_batch(app: ModuleType, urls: List[str], num_questions: int, stage_workers: Dict[str, int]):
+    """Menjalankan pipeline batch untuk banyak URL dan menampilkan dataset gabungannya."""
+    try:
+        # Pool koneksi cukup untuk semua tahap yang berjalan bersamaan
+        llm = build_router(
+            llm_api_keys(), st.session_state.stage_routes, app.PROVIDER, st.session_state.hedge_requests,
+            sum(stage_workers.values())
+            + st.session_state.clean_concurrency * stage_workers["clean"]
+            + st.session_state.max_concurrency * stage_workers["answers"],
+            use_cache=st.session_state.use_llm_cache
+        )
+        functions = stage_functions(
+            app, llm, st.session_state.jina_api_key, effective_scrape_ttl(), num_questions, st.session_state.temperature,
+            st.session_state.clean_chunk_tokens, st.session_state.clean_concurrency, st.session_state.clean_mode
+        )
+
+        # Progress container
+        progress_text = st.empty()
+        progress_bar = st.progress(0)
+        progress_text.text(f"Memproses {len(urls)} URL...")
+
+        sources = set()
+        dedup_enabled = st.session_state.dedup_questions
+        dedup_threshold = st.session_state.dedup_threshold
+        dedup_history = st.session_state.dedup_history
+
+        def update_progress(url: str, job, error, done: int, total: int):
+            if error is not None:
+                st.warning(f"Gagal memproses {url}: {error}")
+            elif job["answered"]:
+                sources.add(url)
+            progress_text.text(f"URL selesai: {done} dari {total}...")
+            progress_bar.progress(done / total)
+
+        # Record Q/A ditulis ke disk begitu selesai sehingga memori tidak tumbuh mengikuti jumlah URL
+        filename = f"batch_qa_{time.strftime('%Y%m%d-%H%M%S')}"
+        with DatasetWriter(os.path.join(JOB_OUTPUT_DIR, filename), ["Sumber URL", "Pertanyaan", "Jawaban"], parquet=st.session_state.write_parquet) as writer:
+            process_urls(
+                urls,
+                **functions,
+                stage_workers=stage_workers,
+                answer_concurrency=st.session_state.max_concurrency,
+                on_url_done=update_progress,
+                retrieval_mode=st.session_state.retrieval_mode,
+                retrieval_top_k=st.session_state.retrieval_top_k,
+                answer_batch_size=st.session_state.answer_batch_size,
+                on_record=writer.write,
+                dedup_fn=(lambda url, questions: get_question_index().filter(url, questions, dedup_threshold, dedup_history)[0]) if dedup_enabled else None,
+                corpus=get_corpus(),
+                run_id=filename,
+                incremental=st.session_state.incremental
+            )
+
+        # Clear progress indicators
+        progress_text.empty()
+        progress_bar.empty()
+
+        if not writer.count:
+            st.error("Tidak ada URL yang berhasil diproses.")
+            return
+
+        # Disimpan agar rerun (mis. klik tombol unduh) menampilkan hasil ini lagi tanpa memanggil API
+        result = {
+            "mode": "batch", "urls": len(urls), "filename": filename, "paths": writer.paths,
+            "count": writer.count, "sources": len(sources),
+        }
+        st.session_state.last_result = result
+        show_batch_result(result)
+
+    except Exception as e:
+        st.error(f"Terjadi kesalahan: {str(e)}")
+
+def run_single(app: ModuleType, website_url: str, num_questions: int):
+    """Menjalankan scrape → clean → pertanyaan → jawaban untuk satu URL sambil menampilkan hasilnya."""
+    try:
+        # Backend LLM per tahap dengan pool koneksi keep-alive bersama untuk API key pengguna
+        llm = build_router(
+            llm_api_keys(), st.session_state.stage_routes, app.PROVIDER, st.session_state.hedge_requests,
+            max(st.session_state.max_concurrency, st.session_state.clean_concurrency),
+            use_cache=st.session_state.use_llm_cache
+        )
+        
+        # Progress container
+        progress_text = st.empty()
+        progress_bar = st.progress(0)
+        
+        # Step 1: Scraping
+        progress_text.text("Melakukan scraping website...")
+        progress_bar.progress(0.2)
+        scraped_data = scrape_website(website_url, st.session_state.jina_api_key, effective_scrape_ttl())
+        
+        if scraped_data:
+            filename = f"scraped_data_{time.strftime('%Y%m%d-%H%M%S')}"
+
+            # Mode inkremental: hanya bagian halaman yang berubah sejak versi tercatat di korpus yang diproses
+            corpus = get_corpus()
+            incremental = st.session_state.incremental
+            diff = SectionDiff(scraped_data, corpus.section_hashes(website_url) if incremental else None)
+            kept = corpus.pairs_for_sections(website_url, diff.unchanged_hashes()) if incremental else []
+            if not diff.is_full:
+                st.info(f"{len(diff.changed)} dari {len(diff.sections)} bagian halaman berubah; {len(kept)} pasangan Q/A dari bagian lain dipakai ulang.")
+            if not diff.changed:
+                progress_text.empty()
+                progress_bar.empty()
+                with DatasetWriter(os.path.join(JOB_OUTPUT_DIR, filename), ["Pertanyaan", "Jawaban"], parquet=st.session_state.write_parquet) as writer:
+                    for question, answer in kept:
+                        writer.write({"Pertanyaan": question, "Jawaban": answer})
+                result = {
+                    "mode": "single", "url": website_url, "filename": filename, "paths": writer.paths,
+                    "scraped": scraped_data, "cleaned": "", "questions": [q for q, _ in kept], "answers": [a for _, a in kept],
+                }
+                st.session_state.last_result = result
+                show_last_result(result)
+                return
+
+            # Step 2: Cleaning (hasil di-stream ke pratinjau)
+            progress_text.text("Membersihkan data...")
+            progress_bar.progress(0.4)
+            cleaning_preview = st.empty()
+            preclean_reports = []
+            cleaned_data = clean_data(
+                app,
+                diff.delta_text(),
+                llm,
+                st.session_state.temperature,
+                st.session_state.clean_chunk_tokens,
+                st.session_state.clean_concurrency,
+                on_token=throttle(lambda text: cleaning_preview.container(height=300).markdown(text)),
+                mode=st.session_state.clean_mode,
+                on_report=preclean_reports.append
+            )
+            cleaning_preview.empty()
+            st.caption(format_report(preclean_reports[0]))
+
+            # Step 3: Generating questions
+            progress_text.text("Menghasilkan pertanyaan...")
+            progress_bar.progress(0.6)
+            questions = app.generate_questions(cleaned_data, llm, num_questions, st.session_state.temperature)
+
+            if not questions:
+                progress_text.empty()
+                progress_bar.empty()
+                st.error("Tidak ada pertanyaan yang berhasil dihasilkan. Silakan coba lagi.")
+                return
+
+            # Parafrasa dibuang sebelum dijawab agar tidak membayar jawaban yang sama berulang kali
+            if st.session_state.dedup_questions:
+                questions, duplicates = get_question_index().filter(
+                    website_url, questions, st.session_state.dedup_threshold, st.session_state.dedup_history
+                )
+                if not questions:
+                    progress_text.empty()
+                    progress_bar.empty()
+                    st.error("Semua pertanyaan yang dihasilkan merupakan duplikat pertanyaan sebelumnya.")
+                    return
+                if duplicates:
+                    st.info(f"{len(duplicates)} pertanyaan yang mirip dibuang sebelum dijawab.")
+
+            # Step 4: Generating answers (paralel, urutan pertanyaan tetap)
+            total_questions = len(questions)
+            temperature = st.session_state.temperature
+            progress_text.text(f"Menghasilkan jawaban untuk {total_questions} pertanyaan...")
+
+            def update_progress(done: int, total: int):
+                progress_text.text(f"Jawaban selesai: {done} dari {total} pertanyaan...")
+                progress_bar.progress(0.6 + (0.4 * done / total))
+
+            # Blok Q/A muncul begitu jawabannya mulai di-stream; Q/A yang dipakai ulang tampil lebih dulu
+            results_box = st.expander("Lihat Hasil", expanded=True)
+            for i, (question, answer) in enumerate(kept):
+                results_box.markdown(qa_markdown(i, question, answer))
+            answer_blocks = [results_box.empty() for _ in questions]
+
+            def render_answer(i: int, answer: Optional[str]):
+                answer_blocks[i].markdown(qa_markdown(len(kept) + i, questions[i], answer))
+
+            stream_renderers = [throttle(lambda text, i=i: render_answer(i, text)) for i in range(total_questions)]
+
+            # Jawaban ditulis ke disk begitu selesai; yang gagal tidak ikut disimpan
+            writer = DatasetWriter(os.path.join(JOB_OUTPUT_DIR, filename), ["Pertanyaan", "Jawaban"], parquet=st.session_state.write_parquet)
+
+            sections = diff.attribute(questions)
+
+            def record_answer(i: int, answer: str):
+                render_answer(i, answer)
+                writer.write({"Pertanyaan": questions[i], "Jawaban": answer})
+                corpus.add(filename, website_url, sections[i], questions[i], answer)
+
+            # Indeks passage dibangun sekali; tiap pertanyaan hanya membawa konteks yang relevan
+            passage_index = PassageIndex(cleaned_data, st.session_state.retrieval_mode)
+            with writer:
+                for question, answer in kept:
+                    writer.write({"Pertanyaan": question, "Jawaban": answer})
+                answers = answer_questions(
+                    questions,
+                    passage_index,
+                    answer_fn=lambda question, context, on_token=None: app.get_ai_answer(question, context, llm, temperature, on_token),
+                    batch_answer_fn=lambda batch, context: app.get_ai_answers_batch(batch, context, llm, temperature),
+                    top_k=st.session_state.retrieval_top_k,
+                    batch_size=st.session_state.answer_batch_size,
+                    max_workers=st.session_state.max_concurrency,
+                    on_progress=update_progress,
+                    on_answer=record_answer,
+                    on_token=lambda i, text: stream_renderers[i](text)
+                )
+            for i, answer in enumerate(answers):
+                if answer is None:
+                    render_answer(i, None)
+            if all(answer is not None for answer in answers):
+                # Versi halaman ini baru dicatat setelah semua pertanyaannya terjawab
+                corpus.set_sections(website_url, diff.hashes)
+
+            # Clear progress indicators
+            progress_text.empty()
+            progress_bar.empty()
+
+            # Disimpan agar rerun (mis. klik tombol unduh) menampilkan hasil ini lagi tanpa memanggil API
+            result = {
+                "mode": "single", "url": website_url, "filename": filename, "paths": writer.paths,
+                "scraped": scraped_data, "cleaned": cleaned_data,
+                "questions": [q for q, _ in kept] + questions, "answers": [a for _, a in kept] + answers,
+            }
+            st.session_state.last_result = result
+            show_single_summary(result)
+
+    except Exception as e:
+        st.error(f"Terjadi kesalahan: {str(e)}")
+
+def submit_job(app: ModuleType, mode: str, urls: List[str], num_questions: int, stage_workers: Optional[Dict[str, int]] = None):
+    """Mengirim run ke antrean job bersama; pipeline berjalan di luar thread skrip Streamlit.
+
+    Parameter job disimpan di SQLite dan menjadi kunci pemakaian ulang, sehingga API key hanya
+    dibawa closure runner dan tidak pernah ditulis ke disk.
+    """
+    api_keys = llm_api_keys()
+    jina_api_key = st.session_state.jina_api_key
+    params = {"backend": app.PROVIDER, "mode": mode, "urls": urls, "num_questions": num_questions}
+    params.update({key: st.session_state[key] for key in RUN_CONFIG_KEYS})
+    params.update(scrape_ttl_hours=effective_scrape_ttl(), write_parquet=st.session_state.write_parquet)
+    if stage_workers:
+        params["stage_workers"] = stage_workers
+    key = job_key(app.PROVIDER, {name: value for name, value in params.items() if name not in NON_OUTPUT_PARAMS})
+
+    def runner(job_id: str, progress: Callable[[Optional[float], str], None]) -> Dict:
+        workers = {**DEFAULT_STAGE_WORKERS, **params.get("stage_workers", {})}
+        # Pool koneksi cukup untuk semua tahap yang berjalan bersamaan
+        llm = build_router(
+            api_keys, params["stage_routes"], app.PROVIDER, params["hedge_requests"],
+            sum(workers.values())
+            + params["clean_concurrency"] * workers["clean"]
+            + params["max_concurrency"] * workers["answers"],
+            use_cache=params["use_llm_cache"]
+        )
+        return run_url_job(
+            urls,
+            mode,
+            os.path.join(JOB_OUTPUT_DIR, f"qa_{job_id}"),
+            progress,
+            # Checkpoint per kunci job: job yang dikirim ulang setelah restart melanjutkan dari sini
+            CheckpointStore(os.path.join(JOB_OUTPUT_DIR, "checkpoints"), namespace=key),
+            **stage_functions(
+                app, llm, jina_api_key, params["scrape_ttl_hours"], num_questions, params["temperature"],
+                params["clean_chunk_tokens"], params["clean_concurrency"], params["clean_mode"]
+            ),
+            parquet=params["write_parquet"],
+            stage_workers=workers,
+            answer_concurrency=params["max_concurrency"],
+            retrieval_mode=params["retrieval_mode"],
+            retrieval_top_k=params["retrieval_top_k"],
+            answer_batch_size=params["answer_batch_size"],
+            dedup_fn=(
+                lambda url, questions: get_question_index().filter(url, questions, params["dedup_threshold"], params["dedup_history"])[0]
+            ) if params["dedup_questions"] else None,
+            corpus=get_corpus(),
+            run_id=job_id,
+            incremental=params["incremental"]
+        )
+
+    # Job dengan pengaturan sama yang masih berjalan, atau selesai dalam TTL cache scrape, dipakai ulang;
+    # run incremental (TTL 0) hanya bergabung dengan job yang masih berjalan
+    job_id, reused = get_job_queue().submit(
+        app.PROVIDER, params, runner, reuse_within=params["scrape_ttl_hours"] * 3600, key=key
+    )
+    if reused:
+        st.info("Job dengan pengaturan yang sama sedang berjalan atau baru selesai; hasilnya dipakai ulang.")
+    st.session_state.active_job = job_id
+    st.query_params["job"] = job_id
+
+@st.fragment(run_every=1.0)
+def show_job_status():
+    """Memantau job aktif tiap detik; begitu selesai, seluruh halaman digambar ulang dengan hasilnya."""
+    queue = get_job_queue()
+    job = queue.get(st.session_state.active_job)
+    if job is None:
+        st.session_state.active_job = None
+        st.query_params.pop("job", None)
+        st.rerun()
+    if job["status"] in ACTIVE_STATUSES:
+        st.caption(f"Job `{job['id']}` {'menunggu giliran' if job['status'] == 'queued' else 'sedang berjalan'}. Halaman boleh ditutup; buka lagi tautan ini untuk melihat hasilnya.")
+        st.progress(job["progress"], text=job["message"] or "")
+        return
+
+    st.session_state.active_job = None
+    if job["status"] == "done":
+        st.session_state.last_result = job["result"]
+    else:
+        st.session_state.job_error = job["error"]
+    run_metrics = queue.run_metrics(job["id"])
+    if run_metrics is not None:
+        st.session_state.last_run_metrics = run_metrics
+    st.rerun()
+
+def run_app(app: ModuleType):
+    """Halaman Streamlit lengkap untuk entry point app (modul dengan PROVIDER dan fungsi prompt)."""
+    # Inisialisasi session state
+    initialize_session_state(app.PROVIDER)
+    
+    st.title("ZANDREGSS BOT")
+    st.write("Masukkan API keys dan URL untuk menjalankan.")
+
+    # Sidebar untuk input API keys dan pengaturan
+    with st.sidebar:
+        st.header("Konfigurasi")
+        
+        # API Keys section
+        st.subheader("API Keys")
+        # Key backend bawaan diminta lebih dulu; key provider lain hanya untuk rute per tahap atau hedge
+        key_inputs = {app.PROVIDER: st.text_input(f"Masukkan {PROVIDERS[app.PROVIDER]} API Key:", type="password", key=f"{app.PROVIDER}_key_input")}
+        jina_api_key = st.text_input("Masukkan Jina AI API Key:", type="password", key="jina_key_input")
+        for provider, label in PROVIDERS.items():
+            if provider != app.PROVIDER:
+                key_inputs[provider] = st.text_input(
+                    f"{label} API Key (opsional):", type="password", key=f"{provider}_key_input",
+                    help=f"Diperlukan bila salah satu tahap diarahkan ke {label} atau untuk hedge ke {label}."
+                )
+        
+        if st.button("Simpan API Keys"):
+            for provider, api_key in key_inputs.items():
+                st.session_state[f"{provider}_api_key"] = api_key
+            st.session_state.jina_api_key = jina_api_key
+            st.success("API Keys berhasil disimpan!")
+        
+        # Temperature setting
+        st.subheader("Pengaturan Model")
+        temperature = st.slider(
+            "Temperatur (Kreativitas)",
+            min_value=0.0,
+            max_value=2.0,
+            value=st.session_state.temperature,
+            step=0.1,
+            help="Semakin tinggi nilai (mendekati 2.0), semakin kreatif dan beragam hasilnya. Semakin rendah (mendekati 0), semakin konsisten dan fokus hasilnya."
+        )
+        st.session_state.temperature = temperature
+        
+        # Explanation of temperature
+        st.info("""
+        **Panduan Temperatur:**
+        - 0.0-0.3: Jawaban sangat konsisten dan faktual
+        - 0.4-0.7: Keseimbangan antara kreativitas dan konsistensi
+        - 0.8-1.2: Lebih kreatif dan beragam
+        - 1.3-2.0: Sangat kreatif dan eksploratif
+        """)
+
+        # Concurrency setting
+        max_concurrency = st.slider(
+            "Jumlah permintaan paralel",
+            min_value=1,
+            max_value=16,
+            value=st.session_state.max_concurrency,
+            help="Jumlah maksimum pertanyaan yang dijawab secara bersamaan. Turunkan jika sering terkena batas rate API."
+        )
+        st.session_state.max_concurrency = max_concurrency
+
+        # Backend LLM per tahap
+        st.subheader("Backend per Tahap")
+        api_keys = llm_api_keys()
+        available = [provider for provider in PROVIDERS if api_keys[provider]] or [app.PROVIDER]
+        stage_routes = {}
+        for stage, label in LLM_STAGES.items():
+            current = st.session_state.stage_routes.get(stage, app.PROVIDER)
+            stage_routes[stage] = st.selectbox(
+                label,
+                options=available,
+                index=available.index(current) if current in available else 0,
+                format_func=lambda provider: f"{PROVIDERS[provider]} ({DEFAULT_MODELS[provider]})",
+                key=f"route_{stage}"
+            )
+        st.session_state.stage_routes = stage_routes
+        hedge_requests = st.checkbox(
+            "Hedge ke backend lain",
+            value=st.session_state.hedge_requests and len(available) > 1,
+            disabled=len(available) < 2,
+            help="Panggilan yang belum selesai setelah p95 latensi backend-nya dikirim juga ke provider lain; respons pertama yang dipakai. Memangkas ekor latensi pada batch besar dengan biaya sebagian kecil permintaan ganda. Perlu API key kedua provider."
+        )
+        st.session_state.hedge_requests = hedge_requests
+
+        # Chunked cleaning settings
+        st.subheader("Pembersihan Data")
+        clean_chunk_tokens = st.number_input(
+            "Ukuran potongan (token)",
+            min_value=200,
+            max_value=8000,
+            value=st.session_state.clean_chunk_tokens,
+            step=100,
+            help="Halaman panjang dipecah per judul/paragraf menjadi potongan sebesar ini lalu dibersihkan terpisah, sehingga tidak terpotong oleh batas max_tokens."
+        )
+        st.session_state.clean_chunk_tokens = clean_chunk_tokens
+        clean_concurrency = st.slider(
+            "Potongan yang dibersihkan paralel",
+            min_value=1,
+            max_value=16,
+            value=st.session_state.clean_concurrency
+        )
+        st.session_state.clean_concurrency = clean_concurrency
+        clean_mode = st.selectbox(
+            "Mode pembersihan",
+            options=list(CLEAN_MODES),
+            format_func=CLEAN_MODES.get,
+            index=list(CLEAN_MODES).index(st.session_state.clean_mode),
+            help="Menu, gambar, tautan, boilerplate dan blok berulang selalu dibuang lokal lebih dulu. Mode 'auto' melewati panggilan LLM bila hasilnya sudah berupa teks bersih."
+        )
+        st.session_state.clean_mode = clean_mode
+
+        # Answer context settings
+        st.subheader("Konteks Jawaban")
+        retrieval_mode = st.selectbox(
+            "Pemilihan passage",
+            options=list(RETRIEVAL_MODES),
+            index=list(RETRIEVAL_MODES).index(st.session_state.retrieval_mode),
+            format_func=RETRIEVAL_MODES.get,
+            help="Dokumen lengkap mengirim seluruh teks di setiap pertanyaan. BM25/TF-IDF hanya mengirim passage paling relevan sehingga token input dan latensi per jawaban jauh lebih kecil."
+        )
+        st.session_state.retrieval_mode = retrieval_mode
+        retrieval_top_k = st.number_input(
+            "Jumlah passage per pertanyaan (top-k)",
+            min_value=1,
+            max_value=20,
+            value=st.session_state.retrieval_top_k,
+            disabled=retrieval_mode == "full"
+        )
+        st.session_state.retrieval_top_k = retrieval_top_k
+        answer_batch_size = st.number_input(
+            "Pertanyaan per permintaan",
+            min_value=1,
+            max_value=MAX_BATCH_SIZE,
+            value=st.session_state.answer_batch_size,
+            help="Lebih dari 1: beberapa pertanyaan dijawab dalam satu permintaan (respons JSON) sehingga jumlah panggilan API jauh berkurang. Pertanyaan yang jawabannya hilang atau rusak otomatis ditanyakan ulang satu per satu."
+        )
+        st.session_state.answer_batch_size = answer_batch_size
+
+        # Rate limit settings; tiap provider punya scheduler sendiri, termasuk yang hanya dipakai rute per tahap
+        st.subheader("Batas Rate API")
+        rate_limits = {}
+        for provider, label in PROVIDERS.items():
+            rpm, tpm = st.session_state.rate_limits[provider]
+            cols = st.columns(2)
+            rate_limits[provider] = [
+                cols[0].number_input(
+                    f"RPM {label}",
+                    min_value=1,
+                    max_value=100_000,
+                    value=rpm,
+                    key=f"rpm_{provider}",
+                    help=f"Permintaan per menit; sesuaikan dengan batas akun {label} Anda. Permintaan diantrekan agar tetap di bawah batas; error 429/5xx diulang otomatis dengan backoff."
+                ),
+                cols[1].number_input(
+                    f"TPM {label}",
+                    min_value=0,
+                    max_value=100_000_000,
+                    value=tpm,
+                    step=10_000,
+                    key=f"tpm_{provider}",
+                    help="Token per menit. Isi 0 untuk tanpa batas token."
+                ),
+            ]
+            configure_scheduler(provider, *rate_limits[provider])
+        st.session_state.rate_limits = rate_limits
+
+        # Completion cache
+        st.subheader("Cache")
+        use_llm_cache = st.checkbox(
+            "Gunakan cache completion",
+            value=st.session_state.use_llm_cache,
+            help="Prompt yang identik dengan run sebelumnya diambil dari cache di disk tanpa memanggil API. Matikan untuk memaksa permintaan baru."
+        )
+        st.session_state.use_llm_cache = use_llm_cache
+        # Hanya berlaku untuk run sesi ini; sesi lain dan job latar belakang memakai pengaturannya sendiri
+        completion_cache = get_completion_cache()
+        cache_stats = completion_cache.stats()
+        st.caption(
+            f"Hit: {cache_stats['hits']} · Miss: {cache_stats['misses']} · "
+            f"{cache_stats['entries']} entri ({cache_stats['bytes'] / 1_048_576:.1f} MB)"
+        )
+        if st.button("Kosongkan cache"):
+            completion_cache.clear()
+            st.success("Cache completion berhasil dikosongkan!")
+
+        scrape_ttl_hours = st.number_input(
+            "Masa berlaku cache scraping (jam)",
+            min_value=0,
+            max_value=24 * 30,
+            value=st.session_state.scrape_ttl_hours,
+            help="Halaman yang di-scrape dalam rentang ini dipakai ulang tanpa memanggil Jina. Setelah kedaluwarsa, halaman divalidasi ulang; isi 0 untuk selalu memvalidasi ulang."
+        )
+        st.session_state.scrape_ttl_hours = scrape_ttl_hours
+        incremental = st.checkbox(
+            "Proses ulang hanya bagian yang berubah",
+            value=st.session_state.incremental,
+            help="Halaman dibandingkan per bagian (judul) dengan versi yang tercatat di korpus; hanya bagian baru/berubah yang dibersihkan, dibuatkan pertanyaan dan dijawab. Halaman selalu diambil ulang tanpa cache scraping."
+        )
+        st.session_state.incremental = incremental
+
+        # Question dedup settings
+        st.subheader("Deduplikasi Pertanyaan")
+        dedup_questions = st.checkbox(
+            "Buang pertanyaan yang mirip",
+            value=st.session_state.dedup_questions,
+            help="Parafrasa dari pertanyaan yang sama dibuang sebelum dijawab sehingga tidak membayar jawaban yang berulang."
+        )
+        st.session_state.dedup_questions = dedup_questions
+        dedup_threshold = st.slider(
+            "Ambang kemiripan",
+            min_value=0.3,
+            max_value=1.0,
+            value=float(st.session_state.dedup_threshold),
+            step=0.05,
+            disabled=not dedup_questions,
+            help="Perkiraan kemiripan Jaccard (MinHash) minimum agar dua pertanyaan dianggap duplikat. Pertanyaan dengan nomor pasal berbeda tidak pernah dianggap duplikat."
+        )
+        st.session_state.dedup_threshold = dedup_threshold
+        dedup_history = st.checkbox(
+            "Bandingkan juga dengan pertanyaan dari URL lain",
+            value=st.session_state.dedup_history,
+            disabled=not dedup_questions,
+            help=f"Menggunakan indeks pertanyaan tersimpan ({len(get_question_index())} pertanyaan) dari run sebelumnya."
+        )
+        st.session_state.dedup_history = dedup_history
+
+        # Output settings
+        st.subheader("Output")
+        write_parquet = st.checkbox(
+            "Tulis juga dataset Parquet",
+            value=st.session_state.write_parquet and parquet_available(),
+            disabled=not parquet_available(),
+            help="Selain CSV dan JSONL, record ditulis per batch ke folder Parquet." if parquet_available() else "Instal pyarrow untuk mengaktifkan output Parquet."
+        )
+        st.session_state.write_parquet = write_parquet
+        use_job_queue = st.checkbox(
+            "Jalankan sebagai job latar belakang",
+            value=st.session_state.use_job_queue,
+            help="Pipeline berjalan di antrean server bersama: tetap jalan walau browser ditutup, dan permintaan yang sama tidak dijalankan dua kali."
+        )
+        st.session_state.use_job_queue = use_job_queue
+        job_counts = get_job_queue().store.counts()
+        if job_counts.get("queued") or job_counts.get("running"):
+            st.caption(f"Antrean job: {job_counts.get('running', 0)} berjalan, {job_counts.get('queued', 0)} menunggu.")
+
+        # Metrik run terakhir; diperbarui begitu run berikutnya selesai
+        metrics_panel = st.empty()
+        if st.session_state.last_run_metrics is not None:
+            with metrics_panel.container():
+                show_run_metrics(st.session_state.last_run_metrics)
+
+    # Main content
+    mode = st.radio("Mode", ["URL tunggal", "Batch (banyak URL)"], horizontal=True)
+    if mode == "URL tunggal":
+        website_url = st.text_input("Masukkan URL website:")
+    else:
+        urls_text = st.text_area("Masukkan daftar URL (satu per baris):")
+        urls_file = st.file_uploader("Atau unggah file daftar URL (.txt/.csv):", type=["txt", "csv"])
+        with st.expander("Pengaturan pipeline batch"):
+            st.caption("Jumlah pekerja per tahap. Tahap berjalan bersamaan: URL berikutnya di-scrape selagi URL sebelumnya dijawab.")
+            cols = st.columns(4)
+            stage_workers = {
+                "scrape": cols[0].number_input("Scraping", min_value=1, max_value=16, value=DEFAULT_STAGE_WORKERS["scrape"]),
+                "clean": cols[1].number_input("Pembersihan", min_value=1, max_value=16, value=DEFAULT_STAGE_WORKERS["clean"]),
+                "questions": cols[2].number_input("Pertanyaan", min_value=1, max_value=16, value=DEFAULT_STAGE_WORKERS["questions"]),
+                "answers": cols[3].number_input("Jawaban", min_value=1, max_value=16, value=DEFAULT_STAGE_WORKERS["answers"]),
+            }
+    num_questions = st.number_input("Berapa banyak pertanyaan yang ingin dihasilkan?", min_value=1, max_value=20, value=5)
+
+    if st.button("Mulai Scraping"):
+        # Hanya key provider yang benar-benar dipakai rute per tahap yang wajib diisi
+        api_keys = llm_api_keys()
+        missing = [PROVIDERS[provider] for provider in sorted(required_providers(st.session_state.stage_routes, app.PROVIDER)) if not api_keys[provider]]
+        if not st.session_state.jina_api_key:
+            missing.append("Jina AI")
+        if missing:
+            st.error(f"Mohon masukkan API key {', '.join(missing)} terlebih dahulu di sidebar!")
+            return
+
+        if mode != "URL tunggal":
+            uploaded = urls_file.getvalue().decode("utf-8", errors="ignore") if urls_file else ""
+            urls = parse_url_list(f"{urls_text}\n{uploaded}")
+            if not urls:
+                st.error("Mohon masukkan minimal satu URL yang valid!")
+                return
+        elif not website_url:
+            st.error("Mohon masukkan URL yang valid!")
+            return
+
+        st.session_state.last_result = None
+        st.session_state.job_error = None
+        if st.session_state.use_job_queue:
+            if mode != "URL tunggal":
+                submit_job(app, "batch", urls, num_questions, stage_workers)
+            else:
+                submit_job(app, "single", [website_url], num_questions)
+        else:
+            # Setiap panggilan API selama run dicatat untuk panel metrik dan file metrik JSON
+            run_config = {"backend": app.PROVIDER, "mode": mode, "num_questions": num_questions}
+            run_config.update({key: st.session_state[key] for key in RUN_CONFIG_KEYS})
+            if mode != "URL tunggal":
+                run_config["stage_workers"] = stage_workers
+            run_metrics = start_run(mode, run_config)
+            try:
+                if mode != "URL tunggal":
+                    run_batch(app, urls, num_questions, stage_workers)
+                else:
+                    run_single(app, website_url, num_questions)
+            finally:
+                run_metrics.finish()
+                run_metrics.save()
+                st.session_state.last_run_metrics = run_metrics
+                with metrics_panel.container():
+                    show_run_metrics(run_metrics)
+            return
+
+    if st.session_state.job_error is not None:
+        st.error(f"Job gagal: {st.session_state.job_error}")
+    elif st.session_state.active_job is not None:
+        show_job_status()
+    elif st.session_state.last_result is not None:
+        show_last_result(st.session_state.last_result)
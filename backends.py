@@ -0,0 +1,308 @@
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from concurrency import with_script_ctx
+from http_client import DEFAULT_POOL_SIZE, get_openai_client, get_session, http_post
+from llm_cache import cached_completion
+from metrics import track_call
+from scheduler import estimate_request_tokens, get_scheduler
+from streaming import iter_sse_data
+
+# Bisa diarahkan ke server lain (mis. stub benchmark) lewat environment variable
+TOGETHER_COMPLETIONS_URL = os.environ.get("TOGETHER_COMPLETIONS_URL", "https://api.together.xyz/v1/completions")
+
+PROVIDERS = {"together": "Together.ai", "openai": "OpenAI"}
+DEFAULT_MODELS = {"together": "Qwen/Qwen2.5-7B-Instruct-Turbo", "openai": "gpt-4o-mini"}
+API_KEY_ENV = {"together": "TOGETHER_API_KEY", "openai": "OPENAI_API_KEY"}
+# Tahap pipeline yang memanggil LLM dan bisa diarahkan ke backend berbeda
+LLM_STAGES = {"clean": "Pembersihan", "questions": "Pertanyaan", "answers": "Jawaban"}
+# Batas max_tokens bila prompt tidak menentukannya (endpoint completions Together mewajibkannya)
+DEFAULT_MAX_TOKENS = 2000
+
+# Hedge baru dikirim setelah latensi backend untuk tahap tersebut cukup sampelnya
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+class LatencyTracker:
+    """Latensi panggilan API terakhir per (backend, tahap), dasar ambang waktu pengiriman hedge.
+
+    Hanya panggilan yang berhasil dan benar-benar menyentuh API yang dicatat; hit cache
+    akan menurunkan persentil sehingga hedge terkirim terlalu cepat.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = HEDGE_MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[Tuple[str, str], deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, backend: str, stage: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault((backend, stage), deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, backend: str, stage: str, p: float = HEDGE_PERCENTILE) -> Optional[float]:
+        """Persentil latensi, atau None bila sampel belum mencapai min_samples."""
+        with self._lock:
+            samples = list(self._samples.get((backend, stage), ()))
+        if len(samples) < self.min_samples:
+            return None
+        return float(np.percentile(samples, p))
+
+_tracker = LatencyTracker()
+
+def get_latency_tracker() -> LatencyTracker:
+    """Mengembalikan pencatat latensi bersama; ambang hedge berlaku lintas run dan sesi."""
+    return _tracker
+
+class Backend(ABC):
+    """Satu provider + model LLM. Subclass membangun payload dan mengirim permintaannya.
+
+    Semua panggilan melalui cache completion, scheduler provider (rate limit dan retry)
+    dan metrik run, sama seperti sebelumnya di masing-masing entry point.
+    """
+
+    provider = ""
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or DEFAULT_MODELS[self.provider]
+
+    @property
+    def name(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+    @abstractmethod
+    def build_request(self, prompt: str, system: Optional[str], temperature: float,
+                      max_tokens: Optional[int], json_mode: bool) -> Dict:
+        """Payload permintaan provider; juga menjadi kunci cache completion."""
+
+    @abstractmethod
+    def send(self, request: Dict, call: Dict, on_token: Optional[Callable[[str], None]]) -> Optional[str]:
+        """Mengirim payload dan mengembalikan teks completion; pemakaian token dicatat ke call."""
+
+    def complete(self, stage: str, prompt: str, system: Optional[str] = None, temperature: float = 0.7,
+                 max_tokens: Optional[int] = None, json_mode: bool = False,
+                 on_token: Optional[Callable[[str], None]] = None, hedge: bool = False,
+                 use_cache: bool = True) -> Optional[str]:
+        """Mengirim prompt dan mengembalikan teks completion (None bila respons kosong).
+
+        Bila on_token diberikan, respons di-stream dan on_token dipanggil dengan teks sejauh ini.
+        Waktu, retry dan pemakaian token dicatat ke metrik run dengan nama tahap stage.
+        use_cache=False memaksa permintaan baru tanpa membaca atau menulis cache completion.
+        """
+        request = self.build_request(prompt, system, temperature, max_tokens, json_mode)
+        with track_call(stage, self.provider, self.model, hedge=hedge) as call:
+            started = time.monotonic()
+            result = cached_completion(
+                self.provider,
+                request,
+                lambda: get_scheduler(self.provider).call(
+                    lambda: self.send(request, call, on_token), estimate_request_tokens(request), stats=call
+                ),
+                use_cache
+            )
+            if "attempts" in call:
+                get_latency_tracker().record(self.name, stage, time.monotonic() - started)
+        if on_token is not None and result is not None:
+            on_token(result)
+        return result
+
+class TogetherBackend(Backend):
+    """Endpoint completions Together.ai; prompt sistem digabung di depan prompt."""
+
+    provider = "together"
+
+    def __init__(self, api_key: str, model: Optional[str] = None):
+        super().__init__(model)
+        self.api_key = api_key
+
+    def build_request(self, prompt, system, temperature, max_tokens, json_mode) -> Dict:
+        return {
+            "model": self.model,
+            "prompt": f"{system}\n\n{prompt}" if system else prompt,
+            "temperature": temperature,
+            "max_tokens": max_tokens or DEFAULT_MAX_TOKENS,
+            "top_p": 0.7,
+            "top_k": 50,
+            "repetition_penalty": 1.1
+        }
+
+    def send(self, request, call, on_token) -> Optional[str]:
+        headers = {
+            "accept": "application/json",
+            "content-type": "application/json",
+            "authorization": f"Bearer {self.api_key}"
+        }
+
+        def record_usage(usage: Optional[Dict]):
+            if usage:
+                call["prompt_tokens"] = usage.get('prompt_tokens', 0)
+                call["completion_tokens"] = usage.get('completion_tokens', 0)
+
+        if on_token is None:
+            response = http_post(TOGETHER_COMPLETIONS_URL, json=request, headers=headers)
+            response.raise_for_status()
+
+            result = response.json()
+            record_usage(result.get('usage'))
+            if 'choices' in result and len(result['choices']) > 0:
+                return result['choices'][0].get('text', '').strip()
+            return None
+
+        content = None
+        with http_post(TOGETHER_COMPLETIONS_URL, json={**request, "stream": True}, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            for event in iter_sse_data(response):
+                record_usage(event.get('usage'))
+                if event.get('choices'):
+                    content = (content or "") + (event['choices'][0].get('text') or "")
+                    on_token(content)
+        return content.strip() if content is not None else None
+
+class OpenAIBackend(Backend):
+    """chat.completions OpenAI; json_mode memakai response_format json_object."""
+
+    provider = "openai"
+
+    def __init__(self, client, model: Optional[str] = None):
+        super().__init__(model)
+        self.client = client
+
+    def build_request(self, prompt, system, temperature, max_tokens, json_mode) -> Dict:
+        messages = [{"role": "system", "content": system}] if system else []
+        request = {"model": self.model, "messages": messages + [{"role": "user", "content": prompt}], "temperature": temperature}
+        if max_tokens:
+            request["max_tokens"] = max_tokens
+        if json_mode:
+            request["response_format"] = {"type": "json_object"}
+        return request
+
+    def send(self, request, call, on_token) -> Optional[str]:
+        def record_usage(usage):
+            if usage is not None:
+                call["prompt_tokens"] = usage.prompt_tokens
+                call["completion_tokens"] = usage.completion_tokens
+
+        if on_token is None:
+            response = self.client.chat.completions.create(**request)
+            record_usage(response.usage)
+            if response.choices and response.choices[0].message and response.choices[0].message.content:
+                return response.choices[0].message.content.strip()
+            return None
+
+        content = ""
+        for chunk in self.client.chat.completions.create(**request, stream=True, stream_options={"include_usage": True}):
+            record_usage(getattr(chunk, "usage", None))
+            if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                content += chunk.choices[0].delta.content
+                on_token(content)
+        return content.strip() or None
+
+def parse_route(spec: str) -> Tuple[str, Optional[str]]:
+    """Memecah rute "provider" atau "provider:model" menjadi (provider, model atau None)."""
+    provider, _, model = spec.partition(":")
+    if provider not in PROVIDERS:
+        raise ValueError(f"Provider LLM tidak dikenal: {provider}")
+    return provider, model or None
+
+def make_backend(provider: str, api_key: str, model: Optional[str] = None) -> Backend:
+    if provider == "openai":
+        return OpenAIBackend(get_openai_client(api_key), model)
+    return TogetherBackend(api_key, model)
+
+class LLMRouter:
+    """Memilih backend per tahap dan mengirim permintaan cadangan (hedge) ke backend alternatif.
+
+    Dengan hedge aktif, panggilan yang belum selesai setelah p95 latensi backend utamanya untuk
+    tahap itu dikirim ulang ke backend alternatif (provider lain), dan respons pertama yang
+    berhasil dipakai. Permintaan yang kalah tetap berjalan sampai selesai dan tercatat di metrik.
+    Panggilan yang di-stream ke UI tidak di-hedge.
+    """
+
+    def __init__(self, routes: Dict[str, Backend], default: Optional[Backend], alternates: Optional[List[Backend]] = None,
+                 hedge: bool = False, use_cache: bool = True):
+        self.routes = routes
+        self.default = default
+        self.alternates = alternates or []
+        self.hedge = hedge
+        self.use_cache = use_cache
+
+    def backend_for(self, stage: str) -> Backend:
+        return self.routes.get(stage, self.default)
+
+    def alternate_for(self, stage: str) -> Optional[Backend]:
+        primary = self.backend_for(stage)
+        return next((b for b in self.alternates if b.provider != primary.provider), None)
+
+    def complete(self, stage: str, prompt: str, on_token: Optional[Callable[[str], None]] = None, **options) -> Optional[str]:
+        """Seperti Backend.complete, melalui backend tahap stage dan hedge bila aktif."""
+        options["use_cache"] = self.use_cache
+        primary = self.backend_for(stage)
+        alternate = self.alternate_for(stage) if self.hedge and on_token is None else None
+        delay = get_latency_tracker().percentile(primary.name, stage) if alternate is not None else None
+        if delay is None:
+            return primary.complete(stage, prompt, on_token=on_token, **options)
+
+        outcomes: queue.Queue = queue.Queue()
+
+        def attempt(backend: Backend, hedge: bool):
+            try:
+                outcomes.put((backend.complete(stage, prompt, hedge=hedge, **options), None))
+            except Exception as e:
+                outcomes.put((None, e))
+
+        threading.Thread(target=with_script_ctx(attempt), args=(primary, False), daemon=True).start()
+        try:
+            result, error = outcomes.get(timeout=delay)
+        except queue.Empty:
+            threading.Thread(target=with_script_ctx(attempt), args=(alternate, True), daemon=True).start()
+            result, error = outcomes.get()
+            if result is None:
+                # Yang pertama selesai gagal atau kosong; tunggu yang satunya
+                result, second_error = outcomes.get()
+                error = second_error if result is None else None
+        if error is not None:
+            raise error
+        return result
+
+def required_providers(routes: Dict[str, str], default: str) -> Set[str]:
+    """Provider yang API key-nya dibutuhkan: tujuan tiap rute, dan provider default bila ada tahap tanpa rute."""
+    providers = {parse_route(spec)[0] for spec in routes.values() if spec}
+    if any(not routes.get(stage) for stage in LLM_STAGES):
+        providers.add(default)
+    return providers
+
+def build_router(api_keys: Dict[str, str], routes: Dict[str, str], default: str, hedge: bool = False,
+                 pool_size: int = DEFAULT_POOL_SIZE, use_cache: bool = True) -> LLMRouter:
+    """Menyusun LLMRouter dari API key per provider dan rute per tahap ("provider" atau "provider:model").
+
+    Tahap tanpa rute memakai model bawaan provider default; API key provider default hanya
+    diperlukan bila ada tahap seperti itu (lihat required_providers). Untuk hedge, setiap provider lain
+    yang API key-nya tersedia menjadi backend alternatif dengan model bawaannya. use_cache
+    berlaku untuk semua panggilan lewat router ini saja, bukan untuk sesi atau job lain.
+    """
+    get_session(pool_size)
+    backends: Dict[Tuple[str, Optional[str]], Backend] = {}
+
+    def backend(provider: str, model: Optional[str] = None) -> Backend:
+        if not api_keys.get(provider):
+            raise ValueError(f"API key {PROVIDERS[provider]} belum diisi")
+        if (provider, model) not in backends:
+            backends[provider, model] = make_backend(provider, api_keys[provider], model)
+        return backends[provider, model]
+
+    alternates = [backend(provider) for provider in PROVIDERS if hedge and api_keys.get(provider)]
+    return LLMRouter(
+        {stage: backend(*parse_route(spec)) for stage, spec in routes.items() if spec},
+        backend(default) if default in required_providers(routes, default) else None,
+        alternates,
+        hedge,
+        use_cache,
+    )
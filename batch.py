@@ -0,0 +1,282 @@
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+from answering import answer_questions
+from checkpoints import CheckpointStore
+from concurrency import run_pipeline
+from corpus import CorpusStore
+from incremental import SectionDiff
+from dataset_writer import DatasetWriter
+from retrieval import DEFAULT_TOP_K, PassageIndex
+
+# Jumlah pekerja bawaan per tahap pipeline batch
+DEFAULT_STAGE_WORKERS = {"scrape": 2, "clean": 2, "questions": 2, "answers": 1}
+# Progres job satu URL setelah tiap tahap selesai; sisanya dibagi rata ke jawaban
+SINGLE_STAGE_PROGRESS = {"scrape": 0.2, "clean": 0.4, "questions": 0.6}
+
+def parse_url_list(text: str) -> List[str]:
+    """Mengambil daftar URL unik (urutan dipertahankan) dari teks bebas, mis. isi file .txt/.csv."""
+    urls = re.findall(r"https?://[^\s,;\"'<>]+", text)
+    return list(dict.fromkeys(urls))
+
+def process_urls(
+    urls: List[str],
+    scrape_fn: Callable[[str], str],
+    clean_fn: Callable[[str], str],
+    questions_fn: Callable[[str], List[str]],
+    answer_fn: Callable[[str, str], Optional[str]],
+    batch_answer_fn: Optional[Callable[[List[str], str], List[Optional[str]]]] = None,
+    stage_workers: Optional[Dict[str, int]] = None,
+    answer_concurrency: int = 4,
+    on_url_done: Optional[Callable[[str, Optional[Dict], Optional[Exception], int, int], None]] = None,
+    checkpoints: Optional[CheckpointStore] = None,
+    retrieval_mode: str = "full",
+    retrieval_top_k: int = DEFAULT_TOP_K,
+    answer_batch_size: int = 1,
+    on_record: Optional[Callable[[Dict], None]] = None,
+    dedup_fn: Optional[Callable[[str, List[str]], List[str]]] = None,
+    corpus: Optional[CorpusStore] = None,
+    run_id: str = "",
+    incremental: bool = False,
+) -> List[Dict]:
+    """Menjalankan scrape → clean → pertanyaan → jawaban untuk banyak URL sebagai pipeline.
+
+    Setiap tahap punya jumlah pekerja sendiri (stage_workers) sehingga URL berikutnya sudah
+    di-scrape selagi jawaban URL sebelumnya dihasilkan. Di tahap jawaban, pertanyaan satu URL
+    dijawab paralel hingga answer_concurrency permintaan. Mengembalikan baris gabungan berisi
+    "Sumber URL", "Pertanyaan" dan "Jawaban" sesuai urutan URL.
+
+    Bila checkpoints diberikan, hasil setiap tahap dan setiap jawaban disimpan begitu selesai;
+    run berikutnya melewati pekerjaan yang sudah tersimpan. Jawaban yang gagal (answer_fn
+    mengembalikan None atau melempar exception) tidak disimpan sehingga dicoba ulang saat dilanjutkan.
+
+    retrieval_mode menentukan konteks yang dikirim ke answer_fn: dokumen lengkap ("full"),
+    atau retrieval_top_k passage paling relevan dari indeks per dokumen ("bm25"/"tfidf").
+    Dengan answer_batch_size > 1, beberapa pertanyaan dijawab per permintaan lewat batch_answer_fn.
+
+    Bila on_record diberikan, setiap record Q/A dikirim ke on_record begitu jawabannya selesai
+    dan tidak dikumpulkan di memori; nilai kembalian kemudian berupa list kosong.
+
+    Bila dedup_fn(url, pertanyaan) diberikan, pertanyaan yang mirip dibuang sebelum dijawab.
+
+    Bila corpus diberikan, setiap pasangan Q/A juga disimpan ke korpus dengan run_id dan hash
+    bagian halaman asal pertanyaannya; pasangan yang sudah ada di korpus tidak ditambahkan lagi.
+    Dengan incremental, hanya bagian halaman yang baru atau berubah sejak versi yang tercatat
+    di korpus yang dibersihkan, dibuatkan pertanyaan dan dijawab; Q/A bagian yang tidak berubah
+    diambil dari korpus dan ikut dikirim sebagai record run ini.
+    """
+    workers = {**DEFAULT_STAGE_WORKERS, **(stage_workers or {})}
+    save_lock = threading.Lock()
+
+    def save(job: Dict):
+        if checkpoints is not None:
+            checkpoints.save(job)
+
+    def scrape(job: Dict) -> Dict:
+        if "scraped" not in job:
+            scraped = scrape_fn(job["url"])
+            if not scraped:
+                raise ValueError(f"Scraping gagal untuk {job['url']}")
+            job["scraped"] = scraped
+            save(job)
+        return job
+
+    def clean(job: Dict) -> Dict:
+        if "cleaned" not in job:
+            source = job["scraped"]
+            if incremental and corpus is not None:
+                if "changed" not in job:
+                    diff = SectionDiff(job["scraped"], corpus.section_hashes(job["url"]))
+                    job["changed"] = diff.changed
+                    job["kept"] = corpus.pairs_for_sections(job["url"], diff.unchanged_hashes())
+                source = SectionDiff(job["scraped"], changed=job["changed"]).delta_text()
+            # Tidak ada bagian yang berubah: tahap berikutnya dilewati tanpa memanggil API
+            job["cleaned"] = clean_fn(source) if job.get("changed", True) else ""
+            save(job)
+        return job
+
+    def questions(job: Dict) -> Dict:
+        if "questions" not in job:
+            if not job.get("changed", True):
+                job["questions"] = []
+                save(job)
+                return job
+            generated = questions_fn(job["cleaned"])
+            if not generated:
+                raise ValueError(f"Tidak ada pertanyaan yang dihasilkan untuk {job['url']}")
+            if dedup_fn is not None:
+                # Bisa kosong bila semua pertanyaan duplikat; URL tetap selesai tanpa record baru
+                generated = dedup_fn(job["url"], generated)
+            job["questions"] = generated
+            save(job)
+        return job
+
+    def answers(job: Dict) -> Dict:
+        done = job.setdefault("answers", {})
+        pending = [i for i in range(len(job["questions"])) if str(i) not in done]
+
+        kept = job.get("kept", [])
+
+        def qa_record(i: int) -> Dict:
+            return {"Sumber URL": job["url"], "Pertanyaan": job["questions"][i], "Jawaban": done[str(i)]}
+
+        diff = SectionDiff(job["scraped"], changed=job.get("changed")) if corpus is not None else None
+        sections = diff.attribute(job["questions"]) if diff is not None else []
+
+        def emit(i: int):
+            if on_record is not None:
+                on_record(qa_record(i))
+            if corpus is not None:
+                corpus.add(run_id, job["url"], sections[i], job["questions"][i], done[str(i)])
+
+        # Q/A bagian yang tidak berubah tetap menjadi bagian dataset run ini
+        kept_pairs = [{"Sumber URL": job["url"], "Pertanyaan": q, "Jawaban": a} for q, a in kept]
+        if on_record is not None:
+            for record in kept_pairs:
+                on_record(record)
+
+        # Jawaban yang dipulihkan dari checkpoint juga dikirim ke penulis dataset dan korpus
+        for i in sorted(int(k) for k in done):
+            emit(i)
+
+        def record(position: int, answer: str):
+            i = pending[position]
+            with save_lock:
+                done[str(i)] = answer
+                save(job)
+            emit(i)
+
+        if pending:
+            answer_questions(
+                [job["questions"][i] for i in pending],
+                PassageIndex(job["cleaned"], retrieval_mode),
+                answer_fn=answer_fn,
+                batch_answer_fn=batch_answer_fn,
+                top_k=retrieval_top_k,
+                batch_size=answer_batch_size,
+                max_workers=answer_concurrency,
+                on_answer=record
+            )
+        # Pertanyaan yang gagal dijawab tidak masuk dataset; dicoba ulang bila run dilanjutkan
+        qa_pairs = kept_pairs + [qa_record(i) for i in range(len(job["questions"])) if str(i) in done]
+        if diff is not None and len(done) == len(job["questions"]):
+            # Versi halaman ini baru dicatat setelah semua pertanyaannya terjawab
+            corpus.set_sections(job["url"], diff.hashes)
+
+        # Hanya ringkasan yang disimpan sampai pipeline selesai agar memori tidak tumbuh per URL
+        return {
+            "url": job["url"],
+            "questions": len(kept) + len(job["questions"]),
+            "answered": len(qa_pairs),
+            "reused": len(kept),
+            "qa_pairs": qa_pairs if on_record is None else [],
+        }
+
+    def item_done(i: int, job: Optional[Dict], error: Optional[Exception], done: int, total: int):
+        if on_url_done:
+            on_url_done(urls[i], job, error, done, total)
+
+    # Job (dan checkpoint-nya) baru dimuat saat URL masuk pipeline; teks halaman hanya hidup
+    # selama URL itu sedang diproses
+    jobs = run_pipeline(
+        (checkpoints.load(url) if checkpoints is not None else {"url": url} for url in urls),
+        [
+            ("scrape", scrape, workers["scrape"]),
+            ("clean", clean, workers["clean"]),
+            ("questions", questions, workers["questions"]),
+            ("answers", answers, workers["answers"]),
+        ],
+        on_item_done=item_done,
+        total=len(urls),
+    )
+
+    rows = []
+    for job in jobs:
+        if job is not None:
+            rows.extend(job["qa_pairs"])
+    return rows
+
+def run_url_job(
+    urls: List[str],
+    mode: str,
+    output_base: str,
+    progress: Callable[[Optional[float], str], None],
+    checkpoints: CheckpointStore,
+    scrape_fn: Callable[[str], str],
+    clean_fn: Callable[[str], str],
+    questions_fn: Callable[[str], List[str]],
+    parquet: bool = False,
+    **pipeline_kwargs,
+) -> Dict:
+    """Menjalankan process_urls di luar UI (job latar belakang) dan mengembalikan hasil yang bisa disimpan sebagai JSON.
+
+    progress(fraksi atau None, pesan) menerima status tiap tahap. Record ditulis ke
+    <output_base>.jsonl/.csv; mode "single" menghasilkan kolom Pertanyaan/Jawaban dan hasil
+    berisi teks scrape, teks bersih, pertanyaan dan jawaban, sama seperti run langsung di UI.
+    Checkpoint URL yang semua pertanyaannya terjawab dihapus setelah selesai; sisanya
+    dipertahankan agar job yang dikirim ulang melanjutkan dari sana.
+    """
+    single = mode == "single"
+    summaries: Dict[str, Dict] = {}
+    errors: List[Exception] = []
+
+    def stage(name: str, fn: Callable) -> Callable:
+        def wrapper(arg):
+            result = fn(arg)
+            if single:
+                progress(SINGLE_STAGE_PROGRESS[name], f"Tahap {name} selesai")
+            return result
+        return wrapper
+
+    def url_done(url: str, job: Optional[Dict], error: Optional[Exception], done: int, total: int):
+        if job is not None:
+            summaries[url] = job
+        if error is not None:
+            errors.append(error)
+        progress(done / total, f"URL selesai: {done} dari {total}")
+
+    fieldnames = ["Pertanyaan", "Jawaban"] if single else ["Sumber URL", "Pertanyaan", "Jawaban"]
+
+    def write(record: Dict):
+        if single:
+            record = {"Pertanyaan": record["Pertanyaan"], "Jawaban": record["Jawaban"]}
+        writer.write(record)
+
+    progress(0.0, f"Memproses {len(urls)} URL...")
+    with DatasetWriter(output_base, fieldnames, parquet=parquet) as writer:
+        process_urls(
+            urls,
+            scrape_fn=stage("scrape", scrape_fn),
+            clean_fn=stage("clean", clean_fn),
+            questions_fn=stage("questions", questions_fn),
+            on_url_done=url_done,
+            checkpoints=checkpoints,
+            on_record=write,
+            **pipeline_kwargs,
+        )
+
+    if single and errors:
+        raise errors[0]
+    if not writer.count and not (single and summaries):
+        raise ValueError("Tidak ada URL yang berhasil diproses.")
+
+    result = {"mode": mode, "filename": os.path.basename(output_base), "paths": writer.paths, "count": writer.count}
+    if single:
+        job = checkpoints.load(urls[0])
+        questions = job.get("questions", [])
+        kept = job.get("kept", [])
+        result.update({
+            "url": urls[0], "scraped": job.get("scraped", ""), "cleaned": job.get("cleaned", ""),
+            "questions": [q for q, _ in kept] + questions,
+            "answers": [a for _, a in kept] + [job.get("answers", {}).get(str(i)) for i in range(len(questions))],
+            "reused": len(kept),
+        })
+    else:
+        result.update({"urls": len(urls), "sources": sum(1 for s in summaries.values() if s["answered"])})
+
+    for url, summary in summaries.items():
+        if summary["answered"] == summary["questions"]:
+            checkpoints.delete(url)
+    return result
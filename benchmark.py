@@ -0,0 +1,201 @@
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+from preclean import CLEAN_MODES
+from stub_servers import StubConfig, start_stub, stub_environment
+
+logger = logging.getLogger("streamlitqa")
+
+def _serve_stubs(jina_config: Dict, llm_config: Dict, conn):
+    # Server tiruan berjalan di proses terpisah agar tidak ikut terukur (CPU, GIL, memori)
+    _, jina_url = start_stub(StubConfig(**jina_config), seed=1)
+    _, llm_url = start_stub(StubConfig(**llm_config), seed=2)
+    conn.send((jina_url, llm_url))
+    while True:
+        time.sleep(3600)
+
+def start_stub_process(jina_config: StubConfig, llm_config: StubConfig):
+    """Menjalankan server tiruan Jina dan LLM di proses anak; mengembalikan (proses, env)."""
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(
+        target=_serve_stubs, args=(jina_config.to_dict(), llm_config.to_dict(), child), daemon=True
+    )
+    process.start()
+    jina_url, llm_url = parent.recv()
+    return process, stub_environment(jina_url, llm_url)
+
+def run_pipeline_benchmark(backend: str, urls: List[str], concurrency: int, args: argparse.Namespace) -> Dict:
+    """Menjalankan pipeline batch satu backend tanpa UI dan mengukur waktu, throughput dan memori."""
+    import cli
+    from batch import process_urls
+    from metrics import start_run
+    from scheduler import configure_scheduler
+
+    cli_args = cli.parse_args([
+        "--backend", backend,
+        "--num-questions", str(args.num_questions),
+        "--concurrency", str(concurrency),
+        "--clean-concurrency", str(concurrency),
+        "--chunk-tokens", str(args.chunk_tokens),
+        "--retrieval-mode", args.retrieval_mode,
+        "--answer-batch-size", str(args.answer_batch_size),
+        "--clean-mode", args.clean_mode,
+        "--scrape-ttl-hours", "0",
+        *[option for route in args.route for option in ("--route", route)],
+        *(["--hedge"] if args.hedge else []),
+    ])
+    stage_functions = cli.build_stage_functions(cli_args)
+    # Batas rate bawaan provider akan mendominasi hasil; benchmark mengukur pipeline, bukan batasnya
+    for provider in (backend, "jina"):
+        configure_scheduler(provider, args.rpm, 0)
+
+    records = [0]
+
+    def count_record(record: Dict):
+        records[0] += 1
+
+    run = start_run(f"benchmark {backend} c={concurrency}", {"backend": backend, "concurrency": concurrency, "urls": len(urls)})
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    failed = []
+    process_urls(
+        urls,
+        **stage_functions,
+        answer_concurrency=concurrency,
+        on_url_done=lambda url, job, error, done, total: failed.append(url) if error is not None else None,
+        retrieval_mode=args.retrieval_mode,
+        answer_batch_size=args.answer_batch_size,
+        on_record=count_record,
+    )
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    run.finish()
+    summary = run.summary()
+    return {
+        "backend": backend,
+        "concurrency": concurrency,
+        "urls": len(urls),
+        "failed_urls": len(failed),
+        "qa_pairs": records[0],
+        "elapsed": elapsed,
+        "urls_per_minute": len(urls) / elapsed * 60 if elapsed else 0.0,
+        "peak_memory_mb": peak / 1_048_576,
+        "stages": {
+            stage: {
+                "calls": data["calls"],
+                "errors": data["errors"],
+                "retries": data["retries"],
+                "throughput": data["throughput"],
+                "p50": data["wall_time"]["p50"],
+                "p95": data["wall_time"]["p95"],
+                "queue_wait_p95": data["queue_wait"]["p95"],
+            }
+            for stage, data in summary["stages"].items()
+        },
+    }
+
+def format_report(results: List[Dict]) -> str:
+    stages = sorted({stage for result in results for stage in result["stages"]}, key=["scrape", "clean", "questions", "answers"].index)
+    header = ["backend", "konkurensi", "waktu (s)", "URL/menit", "Q/A", "gagal", "memori puncak (MB)"]
+    header += [f"{stage} (panggilan/s)" for stage in stages]
+    rows = [header]
+    for r in results:
+        rows.append(
+            [r["backend"], str(r["concurrency"]), f"{r['elapsed']:.2f}", f"{r['urls_per_minute']:.1f}",
+             str(r["qa_pairs"]), str(r["failed_urls"]), f"{r['peak_memory_mb']:.1f}"]
+            + [f"{r['stages'][stage]['throughput']:.2f}" if stage in r["stages"] else "-" for stage in stages]
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark pipeline main.py/llama.py terhadap server tiruan Jina dan API LLM, tanpa biaya API."
+    )
+    parser.add_argument("--backends", nargs="+", choices=["openai", "together"], default=["together", "openai"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8], help="Tingkat konkurensi yang dibandingkan")
+    parser.add_argument("--urls", type=int, default=8, help="Jumlah URL tiruan per run")
+    parser.add_argument("--num-questions", type=int, default=5)
+    parser.add_argument("--chunk-tokens", type=int, default=1500)
+    parser.add_argument("--retrieval-mode", default="full")
+    parser.add_argument("--answer-batch-size", type=int, default=1)
+    parser.add_argument("--clean-mode", choices=list(CLEAN_MODES), default="llm")
+    parser.add_argument("--route", action="append", default=[], help="Rute tahap ke backend lain, diteruskan ke cli.py (mis. clean=together)")
+    parser.add_argument("--hedge", action="store_true", help="Aktifkan hedge ke provider lain")
+    parser.add_argument("--rpm", type=int, default=0, help="Batas RPM scheduler selama benchmark (0 = tanpa batas)")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Median latensi LLM tiruan")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Sebaran log-normal latensi")
+    parser.add_argument("--ms-per-token", type=float, default=0.5, help="Tambahan latensi LLM per token keluaran")
+    parser.add_argument("--jina-latency-ms", type=float, default=500.0)
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Porsi permintaan yang dijawab 429/500")
+    parser.add_argument("--page-kb", type=float, default=20.0, help="Ukuran halaman hasil Jina tiruan")
+    parser.add_argument("--answer-tokens", type=int, default=200, help="Panjang jawaban LLM tiruan (token)")
+    parser.add_argument("--output", default=None, help="File JSON hasil benchmark")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR, format="%(asctime)s %(levelname)s %(message)s")
+
+    llm_config = StubConfig(
+        latency_ms=args.latency_ms, latency_sigma=args.latency_sigma, ms_per_token=args.ms_per_token,
+        error_rate=args.error_rate, answer_tokens=args.answer_tokens,
+    )
+    jina_config = StubConfig(
+        latency_ms=args.jina_latency_ms, latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate, page_kb=args.page_kb,
+    )
+    process, env = start_stub_process(jina_config, llm_config)
+    # Harus di-set sebelum modul aplikasi diimpor: URL endpoint dan direktori cache dibaca saat impor
+    os.environ.update(env)
+    os.environ.update(OPENAI_API_KEY="benchmark", TOGETHER_API_KEY="benchmark", JINA_API_KEY="benchmark")
+    os.environ["QA_CACHE_DIR"] = tempfile.mkdtemp(prefix="qa-benchmark-")
+
+    from llm_cache import get_completion_cache
+    get_completion_cache().enabled = False
+    # Modul aplikasi diimpor di luar pengukuran memori
+    for module in ["cli"] + ["main" if backend == "openai" else "llama" for backend in args.backends]:
+        importlib.import_module(module)
+
+    tracemalloc.start()
+    results = []
+    try:
+        for backend in args.backends:
+            for concurrency in args.concurrency:
+                # URL berbeda per run agar tidak ada hasil yang terbawa dari run sebelumnya
+                run_id = len(results)
+                urls = [f"https://benchmark.local/run{run_id}/artikel-{i}" for i in range(args.urls)]
+                try:
+                    results.append(run_pipeline_benchmark(backend, urls, concurrency, args))
+                except Exception as e:
+                    logger.error("Benchmark %s (konkurensi %d) gagal: %s", backend, concurrency, e)
+    finally:
+        tracemalloc.stop()
+        process.terminate()
+
+    if not results:
+        return 1
+    print(format_report(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "stubs": {"jina": jina_config.to_dict(), "llm": llm_config.to_dict()},
+                "args": vars(args),
+                "results": results,
+            }, f, indent=2)
+        print(f"Hasil disimpan ke {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
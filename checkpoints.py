@@ -0,0 +1,51 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict
+
+from scrape_cache import normalize_url
+
+class CheckpointStore:
+    """Menyimpan progres per URL (hasil tiap tahap dan tiap jawaban) sebagai file JSON.
+
+    namespace membedakan run dengan parameter berbeda (mis. backend dan jumlah pertanyaan)
+    agar checkpoint yang tidak cocok tidak ikut dipakai ulang.
+    """
+
+    def __init__(self, directory: str, namespace: str = ""):
+        self.directory = directory
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(f"{self.namespace}|{normalize_url(url)}".encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def load(self, url: str) -> Dict:
+        """Memuat checkpoint URL, atau job baru bila belum pernah diproses."""
+        path = self._path(url)
+        if not os.path.exists(path):
+            return {"url": url}
+        with open(path, encoding="utf-8") as f:
+            job = json.load(f)
+        job["url"] = url
+        return job
+
+    def save(self, job: Dict):
+        """Menulis checkpoint secara atomik sehingga file tidak pernah setengah jadi saat proses terhenti."""
+        path = self._path(job["url"])
+        data = {k: v for k, v in job.items() if k != "qa_pairs"}
+        with self._lock:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def delete(self, url: str):
+        """Menghapus checkpoint URL, mis. setelah job selesai agar run berikutnya mengambil data baru."""
+        try:
+            os.remove(self._path(url))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,95 @@
+import re
+import threading
+from typing import Callable, List, Optional
+
+from concurrency import run_concurrently
+
+DEFAULT_CHUNK_TOKENS = 1500
+
+_HEADING = re.compile(r"^#{1,6}\s", re.MULTILINE)
+
+def estimate_tokens(text: str) -> int:
+    """Perkiraan kasar jumlah token (±4 karakter per token) tanpa memerlukan tokenizer."""
+    return max(1, len(text) // 4)
+
+def _split_oversized(block: str, max_tokens: int) -> List[str]:
+    """Memecah blok yang masih terlalu besar per paragraf, lalu per baris, lalu per karakter."""
+    for separator in ("\n\n", "\n"):
+        parts = [p for p in block.split(separator) if p.strip()]
+        if len(parts) > 1:
+            return _pack(parts, max_tokens, separator)
+    max_chars = max_tokens * 4
+    return [block[i:i + max_chars] for i in range(0, len(block), max_chars)]
+
+def _pack(blocks: List[str], max_tokens: int, separator: str) -> List[str]:
+    """Menggabungkan blok berurutan menjadi potongan yang tidak melebihi max_tokens."""
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    pending = list(reversed(blocks))
+    while pending:
+        block = pending.pop()
+        block_tokens = estimate_tokens(block)
+        if block_tokens > max_tokens:
+            # Potongan dari blok besar ikut dikemas bersama blok kecil di sekitarnya
+            pending.extend(reversed(_split_oversized(block, max_tokens)))
+            continue
+        if current and current_tokens + block_tokens > max_tokens:
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+        current.append(block)
+        current_tokens += block_tokens
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+def split_sections(text: str) -> List[str]:
+    """Memecah markdown per judul (heading); teks sebelum judul pertama menjadi bagian tersendiri."""
+    starts = [m.start() for m in _HEADING.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    sections = [text[a:b].strip() for a, b in zip(starts, starts[1:] + [len(text)])]
+    return [s for s in sections if s]
+
+def split_markdown(text: str, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[str]:
+    """Memecah markdown hasil Jina menjadi potongan berurutan per judul (heading) dengan batas token."""
+    return _pack(split_sections(text), max_tokens, "\n\n")
+
+def clean_in_chunks(
+    text: str,
+    clean_chunk_fn: Callable[[str, Optional[Callable[[str], None]]], str],
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    max_workers: int = 4,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Membersihkan teks panjang per potongan secara paralel lalu menyambungkannya sesuai urutan asli.
+
+    clean_chunk_fn(potongan, on_chunk_token) membersihkan satu potongan. Bila on_token diberikan,
+    on_token dipanggil dengan gabungan teks semua potongan sejauh ini setiap kali ada token baru.
+    """
+    chunks = split_markdown(text, max_tokens)
+    if len(chunks) <= 1:
+        return clean_chunk_fn(text, on_token)
+
+    partial = [""] * len(chunks)
+    lock = threading.Lock()
+
+    def clean(i: int) -> str:
+        if on_token is None:
+            return clean_chunk_fn(chunks[i], None)
+
+        def update(chunk_text: str):
+            with lock:
+                partial[i] = chunk_text
+                combined = "\n\n".join(p for p in partial if p)
+            on_token(combined)
+
+        return clean_chunk_fn(chunks[i], update)
+
+    cleaned = run_concurrently(
+        clean,
+        list(range(len(chunks))),
+        max_workers=max_workers,
+        on_error=lambda i, e: chunks[i]
+    )
+    return "\n\n".join(c for c in cleaned if c)
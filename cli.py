@@ -0,0 +1,220 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from backends import API_KEY_ENV, LLM_STAGES, PROVIDERS, build_router, parse_route, required_providers
+from batch import DEFAULT_STAGE_WORKERS, parse_url_list, process_urls
+from checkpoints import CheckpointStore
+from chunking import DEFAULT_CHUNK_TOKENS
+from corpus import CORPUS_PATH, CorpusStore
+from dataset_writer import DatasetWriter, parquet_available
+from jobs import job_key
+from metrics import preclean_summary, start_run, summary_rows
+from preclean import CLEAN_MODES
+from question_dedup import DEFAULT_SIMILARITY_THRESHOLD, get_question_index
+from retrieval import DEFAULT_TOP_K, RETRIEVAL_MODES
+from scheduler import DEFAULT_LIMITS, configure_scheduler
+
+logger = logging.getLogger("streamlitqa")
+
+# Argumen yang hanya memengaruhi kecepatan, lokasi output atau pelaporan, bukan isi checkpoint
+NON_OUTPUT_ARGS = (
+    "urls", "urls_file", "concurrency", "clean_concurrency", "rpm", "tpm", "rate_limit", "scrape_workers", "clean_workers",
+    "question_workers", "answer_workers", "checkpoint_dir", "output", "metrics_output", "parquet",
+)
+
+def checkpoint_namespace(args: argparse.Namespace) -> str:
+    """Kunci checkpoint dari semua pengaturan yang memengaruhi hasil, seperti job_key pada antrean job.
+
+    Run yang dilanjutkan dengan pengaturan berbeda (mode pembersihan, ukuran potongan, rute,
+    dedup, inkremental, dsb.) tidak memakai ulang teks bersih atau pertanyaan dari run lama.
+    """
+    return job_key("cli", {key: value for key, value in vars(args).items() if key not in NON_OUTPUT_ARGS})
+
+def parse_stage_routes(specs: List[str]) -> Dict[str, str]:
+    """Mengubah argumen --route "tahap=provider[:model]" menjadi dict rute per tahap."""
+    routes = {}
+    for spec in specs:
+        stage, _, route = spec.partition("=")
+        if stage not in LLM_STAGES or not route:
+            raise SystemExit(f"Rute tidak valid: {spec} (format: {{{','.join(LLM_STAGES)}}}=provider[:model])")
+        try:
+            parse_route(route)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        routes[stage] = route
+    return routes
+
+def parse_rate_limits(args: argparse.Namespace) -> Dict[str, Tuple[int, int]]:
+    """Batas (RPM, TPM) per provider dari --rate-limit "provider=rpm[:tpm]"; --rpm/--tpm berlaku untuk --backend."""
+    limits = dict(DEFAULT_LIMITS)
+    rpm, tpm = limits[args.backend]
+    limits[args.backend] = (args.rpm or rpm, tpm if args.tpm is None else args.tpm)
+    for spec in args.rate_limit:
+        provider, _, values = spec.partition("=")
+        rpm, _, tpm = values.partition(":")
+        if provider not in PROVIDERS or not rpm.isdigit() or not (tpm.isdigit() or not tpm):
+            raise SystemExit(f"Batas rate tidak valid: {spec} (format: {{{','.join(PROVIDERS)}}}=rpm[:tpm])")
+        limits[provider] = (int(rpm), int(tpm) if tpm else limits[provider][1])
+    return limits
+
+def build_stage_functions(args: argparse.Namespace) -> Dict[str, Callable]:
+    """Menyiapkan fungsi tiap tahap dari entry point backend yang dipilih, tanpa UI Streamlit.
+
+    --backend menentukan prompt dan backend bawaan; --route mengarahkan tahap tertentu ke provider
+    lain dan --hedge mengaktifkan hedge ke provider lain yang API key-nya tersedia di environment.
+    """
+    api_keys = {provider: os.environ.get(env, "") for provider, env in API_KEY_ENV.items()}
+    jina_api_key = os.environ.get("JINA_API_KEY", "")
+    routes = parse_stage_routes(args.route)
+    # Key provider bawaan tidak wajib bila semua tahap diarahkan ke provider lain
+    missing = [API_KEY_ENV[provider] for provider in sorted(required_providers(routes, args.backend)) if not api_keys[provider]]
+    if not jina_api_key:
+        missing.append("JINA_API_KEY")
+    if missing:
+        raise SystemExit(f"Set environment variable {' dan '.join(missing)} terlebih dahulu.")
+
+    pool_size = (
+        args.scrape_workers + args.clean_workers + args.question_workers
+        + args.clean_concurrency * args.clean_workers
+        + args.concurrency * args.answer_workers
+    )
+    # Tahap yang dirutekan (dan hedge) memakai scheduler provider tujuannya, jadi semua provider dikonfigurasi
+    for provider, (rpm, tpm) in parse_rate_limits(args).items():
+        configure_scheduler(provider, rpm, tpm)
+    if args.backend == "openai":
+        import main as app
+    else:
+        import llama as app
+    from app_ui import stage_functions
+    llm = build_router(api_keys, routes, args.backend, args.hedge, pool_size)
+    # Run incremental selalu memvalidasi ulang halaman; salinan cache bisa menyembunyikan perubahan
+    scrape_ttl_hours = 0 if args.incremental else args.scrape_ttl_hours
+    return stage_functions(
+        app, llm, jina_api_key, scrape_ttl_hours, args.num_questions, args.temperature,
+        args.chunk_tokens, args.clean_concurrency, args.clean_mode
+    )
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Menjalankan pipeline scrape → clean → pertanyaan → jawaban tanpa Streamlit, dengan checkpoint yang bisa dilanjutkan."
+    )
+    parser.add_argument("urls", nargs="*", help="URL yang akan diproses")
+    parser.add_argument("--urls-file", help="File berisi daftar URL (.txt/.csv)")
+    parser.add_argument("--backend", choices=sorted(API_KEY_ENV), default="openai", help="Entry point (prompt) dan backend LLM bawaan")
+    parser.add_argument("--route", action="append", default=[], metavar="TAHAP=PROVIDER[:MODEL]",
+                        help=f"Arahkan satu tahap ({', '.join(LLM_STAGES)}) ke backend lain, mis. clean=together; boleh diulang")
+    parser.add_argument("--hedge", action="store_true", help="Kirim ulang panggilan yang melewati p95 latensinya ke provider lain; respons pertama dipakai")
+    parser.add_argument("--num-questions", type=int, default=5)
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--concurrency", type=int, default=4, help="Jumlah pertanyaan yang dijawab bersamaan per URL")
+    parser.add_argument("--chunk-tokens", type=int, default=DEFAULT_CHUNK_TOKENS, help="Ukuran potongan untuk tahap pembersihan")
+    parser.add_argument("--clean-concurrency", type=int, default=4, help="Jumlah potongan yang dibersihkan bersamaan per URL")
+    parser.add_argument("--clean-mode", choices=list(CLEAN_MODES), default="llm", help="llm: pra-pembersihan lokal + LLM; auto: lewati LLM bila halaman sudah bersih; local: tanpa LLM")
+    parser.add_argument("--retrieval-mode", choices=sorted(RETRIEVAL_MODES), default="full", help="Konteks untuk menjawab: dokumen lengkap atau top-k passage")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Jumlah passage per pertanyaan untuk mode bm25/tfidf")
+    parser.add_argument("--answer-batch-size", type=int, default=1, help="Jumlah pertanyaan per permintaan jawaban (JSON)")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_SIMILARITY_THRESHOLD, help="Ambang kemiripan MinHash untuk membuang pertanyaan duplikat")
+    parser.add_argument("--no-dedup", action="store_true", help="Jawab semua pertanyaan tanpa membuang yang mirip")
+    parser.add_argument("--no-dedup-history", action="store_true", help="Jangan bandingkan dengan pertanyaan dari URL lain di run sebelumnya")
+    parser.add_argument("--rpm", type=int, default=None, help="Batas permintaan per menit ke provider --backend")
+    parser.add_argument("--tpm", type=int, default=None, help="Batas token per menit ke provider --backend (0 = tanpa batas)")
+    parser.add_argument("--rate-limit", action="append", default=[], metavar="PROVIDER=RPM[:TPM]",
+                        help="Batas rate provider lain untuk tahap yang dirutekan atau hedge, mis. together=600:180000; boleh diulang")
+    parser.add_argument("--scrape-workers", type=int, default=DEFAULT_STAGE_WORKERS["scrape"])
+    parser.add_argument("--clean-workers", type=int, default=DEFAULT_STAGE_WORKERS["clean"])
+    parser.add_argument("--question-workers", type=int, default=DEFAULT_STAGE_WORKERS["questions"])
+    parser.add_argument("--answer-workers", type=int, default=DEFAULT_STAGE_WORKERS["answers"])
+    parser.add_argument("--scrape-ttl-hours", type=float, default=24)
+    parser.add_argument("--checkpoint-dir", default="checkpoints", help="Direktori checkpoint; jalankan ulang perintah yang sama untuk melanjutkan")
+    parser.add_argument("--output", default=None, help="Nama dasar file hasil (tanpa ekstensi); ditulis sebagai .jsonl dan .csv")
+    parser.add_argument("--metrics-output", default=None, help="File JSON metrik run (bawaan: <output>_metrics.json)")
+    parser.add_argument("--parquet", action="store_true", help="Tulis juga dataset Parquet (butuh pyarrow)")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="Korpus Q/A SQLite tempat hasil run juga disimpan")
+    parser.add_argument("--no-corpus", action="store_true", help="Jangan simpan hasil ke korpus Q/A")
+    parser.add_argument("--incremental", action="store_true", help="Proses ulang hanya bagian halaman yang berubah sejak versi di korpus")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args(argv)
+
+    text = "\n".join(args.urls)
+    if args.urls_file:
+        with open(args.urls_file, encoding="utf-8") as f:
+            text += "\n" + f.read()
+    urls = parse_url_list(text)
+    if not urls:
+        logger.error("Tidak ada URL yang valid.")
+        return 2
+
+    stage_functions = build_stage_functions(args)
+    checkpoints = CheckpointStore(args.checkpoint_dir, namespace=checkpoint_namespace(args))
+    failed = []
+    completed = []
+
+    def log_progress(url: str, job, error, done: int, total: int):
+        if error is not None:
+            failed.append(url)
+            logger.error("[%d/%d] Gagal memproses %s: %s", done, total, url, error)
+        else:
+            if job["answered"] == job["questions"]:
+                completed.append(url)
+            logger.info("[%d/%d] Selesai: %s", done, total, url)
+
+    if args.parquet and not parquet_available():
+        logger.warning("pyarrow tidak terpasang; output Parquet dilewati.")
+
+    filename = args.output or f"batch_qa_{time.strftime('%Y%m%d-%H%M%S')}"
+    # Record ditulis begitu selesai; run yang terhenti tetap menyisakan hasil yang sudah jadi
+    writer = DatasetWriter(filename, ["Sumber URL", "Pertanyaan", "Jawaban"], parquet=args.parquet)
+    run_metrics = start_run("cli", {key: value for key, value in vars(args).items() if key not in ("urls", "urls_file")})
+    with writer:
+        process_urls(
+            urls,
+            **stage_functions,
+            stage_workers={
+                "scrape": args.scrape_workers,
+                "clean": args.clean_workers,
+                "questions": args.question_workers,
+                "answers": args.answer_workers,
+            },
+            answer_concurrency=args.concurrency,
+            on_url_done=log_progress,
+            checkpoints=checkpoints,
+            retrieval_mode=args.retrieval_mode,
+            retrieval_top_k=args.top_k,
+            answer_batch_size=args.answer_batch_size,
+            on_record=writer.write,
+            dedup_fn=None if args.no_dedup else (
+                lambda url, questions: get_question_index().filter(url, questions, args.dedup_threshold, not args.no_dedup_history)[0]
+            ),
+            corpus=None if args.no_corpus else CorpusStore(args.corpus),
+            run_id=os.path.basename(filename),
+            incremental=args.incremental and not args.no_corpus,
+        )
+    # Checkpoint URL yang terjawab penuh dihapus setelah output ditutup (seperti run_url_job) agar
+    # run berikutnya mengambil ulang halamannya dan refresh incremental benar-benar berjalan
+    for url in completed:
+        checkpoints.delete(url)
+
+    logger.info("%d pasangan tanya-jawab disimpan ke %s", writer.count, ", ".join(writer.paths.values()))
+
+    run_metrics.finish()
+    summary = run_metrics.summary()
+    for row in summary_rows(summary):
+        logger.info("Metrik %s", ", ".join(f"{key}={value}" for key, value in row.items()))
+    if summary["preclean"]["pages"]:
+        logger.info(preclean_summary(summary))
+    logger.info(
+        "Total %.1f detik, %d panggilan, %d token, $%.4f; metrik disimpan ke %s",
+        summary["duration"], summary["calls"], summary["prompt_tokens"] + summary["completion_tokens"],
+        summary["cost_usd"], run_metrics.save(args.metrics_output or f"{filename}_metrics.json"),
+    )
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+_DONE = object()
+
+def with_script_ctx(func: Callable) -> Callable:
+    """Membungkus func agar thread pekerja mewarisi konteks Streamlit dan contextvars pemanggil.
+
+    Tanpa konteks, st.error/st.warning dari thread pekerja tidak akan tampil di UI dan
+    panggilan API tidak tercatat ke metrik run yang sedang berjalan.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        # Salinan per panggilan: satu Context tidak boleh dijalankan di beberapa thread sekaligus
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+def run_concurrently(
+    func: Callable[[Any], Any],
+    items: Sequence[Any],
+    max_workers: int = 4,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    on_error: Optional[Callable[[Any, Exception], Any]] = None,
+) -> List[Any]:
+    """Menjalankan func untuk setiap item secara paralel dengan batas konkurensi.
+
+    Hasil dikembalikan sesuai urutan items. on_progress(selesai, total) dipanggil dari
+    thread pemanggil setiap kali satu item selesai, sehingga aman untuk memperbarui UI.
+    Kegagalan satu item tidak membatalkan item lain: nilainya diganti hasil on_error
+    (atau None bila on_error tidak diberikan).
+    """
+    total = len(items)
+    results: List[Any] = [None] * total
+    if total == 0:
+        return results
+
+    run_item = with_script_ctx(func)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+        futures = {executor.submit(run_item, item): i for i, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = on_error(items[i], e) if on_error else None
+            if on_progress:
+                on_progress(done, total)
+
+    return results
+
+def run_pipeline(
+    items: Iterable[Any],
+    stages: Sequence[Tuple[str, Callable[[Any], Any], int]],
+    queue_size: int = 2,
+    on_item_done: Optional[Callable[[int, Any, Optional[Exception], int, int], None]] = None,
+    total: Optional[int] = None,
+) -> List[Any]:
+    """Menjalankan items melalui beberapa tahap berurutan yang saling terhubung antrean terbatas.
+
+    stages berisi (nama, func, jumlah_pekerja). Setiap tahap memiliki thread pekerjanya sendiri,
+    sehingga item berikutnya sudah diproses tahap awal selagi item sebelumnya berada di tahap akhir.
+    Antrean berukuran queue_size menahan tahap yang lebih cepat agar tidak menumpuk pekerjaan.
+
+    on_item_done(indeks, hasil, error, selesai, total) dipanggil dari thread pemanggil setiap kali
+    satu item keluar dari pipeline. Item yang gagal di suatu tahap tidak diteruskan ke tahap
+    berikutnya dan hasilnya None. Hasil dikembalikan sesuai urutan items.
+
+    items boleh berupa iterator (mis. generator yang memuat checkpoint); item baru diambil hanya
+    saat tahap pertama punya tempat, sehingga memori mengikuti jumlah item yang sedang diproses,
+    bukan jumlah seluruh item. Untuk iterator, total wajib diberikan.
+    """
+    if total is None:
+        total = len(items)
+    results: List[Any] = [None] * total
+    if total == 0:
+        return results
+
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    output: queue.Queue = queue.Queue()
+    remaining = [max(1, workers) for _, _, workers in stages]
+    lock = threading.Lock()
+
+    def feed():
+        for i, item in enumerate(items):
+            queues[0].put((i, item))
+        for _ in range(remaining[0]):
+            queues[0].put(_DONE)
+
+    def work(stage_index: int, func: Callable[[Any], Any]):
+        inbox = queues[stage_index]
+        is_last = stage_index == len(stages) - 1
+        while True:
+            task = inbox.get()
+            if task is _DONE:
+                break
+            i, value = task
+            try:
+                value = func(value)
+            except Exception as e:
+                output.put((i, None, e))
+                continue
+            if is_last:
+                output.put((i, value, None))
+            else:
+                queues[stage_index + 1].put((i, value))
+
+        # Pekerja terakhir yang selesai di tahap ini menutup tahap berikutnya
+        with lock:
+            remaining[stage_index] -= 1
+            last_worker = remaining[stage_index] == 0
+        if last_worker:
+            if is_last:
+                output.put(_DONE)
+            else:
+                for _ in range(remaining[stage_index + 1]):
+                    queues[stage_index + 1].put(_DONE)
+
+    threads = [threading.Thread(target=with_script_ctx(feed), daemon=True)]
+    for stage_index, (name, func, workers) in enumerate(stages):
+        for n in range(max(1, workers)):
+            threads.append(threading.Thread(
+                target=with_script_ctx(work), args=(stage_index, func), name=f"{name}-{n}", daemon=True
+            ))
+    for thread in threads:
+        thread.start()
+
+    done = 0
+    while True:
+        message = output.get()
+        if message is _DONE:
+            break
+        i, value, error = message
+        results[i] = value
+        done += 1
+        if on_item_done:
+            on_item_done(i, value, error, done, total)
+
+    for thread in threads:
+        thread.join()
+    return results
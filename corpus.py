@@ -0,0 +1,305 @@
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dataset_writer import DatasetWriter
+from question_dedup import normalize_question, strip_question_numbering
+from scrape_cache import normalize_url
+
+logger = logging.getLogger("streamlitqa")
+
+# Satu korpus Q/A untuk seluruh run, menggantikan file CSV bertimestamp yang tersebar
+CORPUS_PATH = os.environ.get("QA_CORPUS_PATH", "qa_corpus.sqlite3")
+EXPORT_FIELDS = ["Sumber URL", "Pertanyaan", "Jawaban", "Hash Konten", "Run"]
+_INSERT_BATCH = 1000
+
+def content_hash(text: str) -> str:
+    """Hash isi dokumen sumber; Q/A dari versi halaman yang berbeda disimpan terpisah."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+class CorpusStore:
+    """Korpus Q/A lokal di SQLite, terindeks menurut URL sumber, hash konten, pertanyaan dan run.
+
+    Satu pasangan disimpan sekali per (URL, hash konten, pertanyaan yang dinormalisasi): menjalankan
+    ulang atau menggabungkan run yang sama tidak menambah duplikat. Ekspor bernama hanya menulis
+    baris yang ditambahkan sejak ekspor sebelumnya dengan nama yang sama.
+    """
+
+    def __init__(self, path: str = CORPUS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS qa ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, content_hash TEXT NOT NULL,"
+            " question TEXT NOT NULL, normalized TEXT NOT NULL, answer TEXT NOT NULL, run_id TEXT NOT NULL,"
+            " created_at REAL NOT NULL, UNIQUE (url, content_hash, normalized))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS qa_content_hash ON qa (content_hash)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS qa_normalized ON qa (normalized)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS qa_run ON qa (run_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS exports (name TEXT PRIMARY KEY, last_id INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        # Hash bagian halaman yang sudah diproses per URL, pembanding untuk pemrosesan ulang inkremental
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sections ("
+            " url TEXT NOT NULL, content_hash TEXT NOT NULL, position INTEGER NOT NULL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (url, content_hash))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _row(run_id: str, url: str, source_hash: str, question: str, answer: str, now: float) -> Tuple:
+        question = strip_question_numbering(question)
+        return (normalize_url(url) if url else "", source_hash, question, normalize_question(question), answer, run_id, now)
+
+    def add(self, run_id: str, url: str, source_hash: str, question: str, answer: str) -> bool:
+        """Menambahkan satu pasangan Q/A; mengembalikan False bila pasangan yang sama sudah ada."""
+        return self.add_many(run_id, [(url, source_hash, question, answer)]) == 1
+
+    def add_many(self, run_id: str, rows: Iterable[Tuple[str, str, str, str]]) -> int:
+        """Menambahkan banyak (url, hash konten, pertanyaan, jawaban) per transaksi; mengembalikan jumlah baris baru."""
+        added = 0
+        batch: List[Tuple] = []
+        now = time.time()
+        for url, source_hash, question, answer in rows:
+            if not question or not answer:
+                continue
+            batch.append(self._row(run_id, url, source_hash, question, answer, now))
+            if len(batch) >= _INSERT_BATCH:
+                added += self._insert(batch)
+                batch = []
+        if batch:
+            added += self._insert(batch)
+        return added
+
+    def _insert(self, rows: List[Tuple]) -> int:
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO qa (url, content_hash, question, normalized, answer, run_id, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def lookup(self, url: Optional[str] = None, source_hash: Optional[str] = None, question: Optional[str] = None,
+               run_id: Optional[str] = None, limit: Optional[int] = 100) -> List[Dict]:
+        """Mencari pasangan Q/A menurut kombinasi URL, hash konten, pertanyaan (dinormalisasi) dan run."""
+        conditions, values = [], []
+        for column, value in (
+            ("url", normalize_url(url) if url else None),
+            ("content_hash", source_hash),
+            ("normalized", normalize_question(question) if question else None),
+            ("run_id", run_id),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                values.append(value)
+        query = "SELECT id, url, content_hash, question, answer, run_id, created_at FROM qa"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(query, values).fetchall()
+        return [dict(zip(("id", "url", "content_hash", "question", "answer", "run_id", "created_at"), row)) for row in rows]
+
+    def section_hashes(self, url: str) -> List[str]:
+        """Hash bagian versi halaman yang terakhir diproses untuk URL, sesuai urutannya."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT content_hash FROM sections WHERE url = ? ORDER BY position", (normalize_url(url),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_sections(self, url: str, hashes: List[str]):
+        """Mencatat hash bagian versi halaman yang baru selesai diproses, menggantikan versi sebelumnya."""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM sections WHERE url = ?", (key,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sections (url, content_hash, position, updated_at) VALUES (?, ?, ?, ?)",
+                [(key, h, i, now) for i, h in enumerate(hashes)],
+            )
+            self._conn.commit()
+
+    def pairs_for_sections(self, url: str, hashes: List[str]) -> List[List[str]]:
+        """Pasangan [pertanyaan, jawaban] URL yang berasal dari bagian dengan hash tertentu, sesuai urutan bagian."""
+        if not hashes:
+            return []
+        order = {h: i for i, h in enumerate(hashes)}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT content_hash, question, answer FROM qa WHERE url = ? AND content_hash IN ({', '.join('?' * len(order))})"
+                " ORDER BY id",
+                (normalize_url(url), *order),
+            ).fetchall()
+        rows.sort(key=lambda row: order[row[0]])
+        return [[question, answer] for _, question, answer in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pairs, urls, runs = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT url), COUNT(DISTINCT run_id) FROM qa"
+            ).fetchone()
+        return {"pairs": pairs, "urls": urls, "runs": runs}
+
+    def _iter_rows(self, query: str, values: Tuple) -> Iterator[Tuple]:
+        # Koneksi baca terpisah (WAL): ekspor korpus besar dibaca bertahap tanpa menahan penulisan run lain
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(query, values)
+            while True:
+                rows = cursor.fetchmany(_INSERT_BATCH)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def export(self, base_path: str, name: Optional[str] = None, run_id: Optional[str] = None,
+               parquet: bool = False) -> Tuple[Dict[str, str], int]:
+        """Mengekspor korpus ke <base_path>.jsonl/.csv; mengembalikan (paths, jumlah baris).
+
+        Dengan name, hanya baris baru sejak ekspor terakhir bernama sama yang ditulis (ekspor
+        inkremental). Dengan run_id, hanya baris dari run tersebut.
+        """
+        last_id = 0
+        if name is not None:
+            with self._lock:
+                row = self._conn.execute("SELECT last_id FROM exports WHERE name = ?", (name,)).fetchone()
+            last_id = row[0] if row else 0
+        query = "SELECT id, url, question, answer, content_hash, run_id FROM qa WHERE id > ?"
+        values: Tuple = (last_id,)
+        if run_id is not None:
+            query += " AND run_id = ?"
+            values += (run_id,)
+        query += " ORDER BY id"
+
+        max_id = last_id
+        with DatasetWriter(base_path, EXPORT_FIELDS, parquet=parquet) as writer:
+            for row_id, url, question, answer, source_hash, row_run in self._iter_rows(query, values):
+                writer.write(dict(zip(EXPORT_FIELDS, (url, question, answer, source_hash, row_run))))
+                max_id = row_id
+        if name is not None:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO exports (name, last_id, updated_at) VALUES (?, ?, ?)", (name, max_id, time.time())
+                )
+                self._conn.commit()
+        return writer.paths, writer.count
+
+    def import_file(self, path: str, run_id: Optional[str] = None) -> int:
+        """Mengimpor dataset CSV/JSONL lama (termasuk scraped_data_<timestamp>.csv tanpa header).
+
+        Kolom yang dikenali: "Sumber URL", "Pertanyaan", "Jawaban" dan opsional "Hash Konten";
+        CSV tanpa header dibaca sebagai (pertanyaan, jawaban) atau (URL, pertanyaan, jawaban).
+        Mengembalikan jumlah baris baru; pasangan yang sudah ada dilewati.
+        """
+        run_id = run_id or f"import:{os.path.basename(path)}"
+        return self.add_many(run_id, _read_records(path))
+
+    def merge(self, other_path: str) -> int:
+        """Menggabungkan korpus SQLite lain ke korpus ini tanpa duplikat; mengembalikan jumlah baris baru."""
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("ATTACH DATABASE ? AS other", (other_path,))
+            try:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO qa (url, content_hash, question, normalized, answer, run_id, created_at)"
+                    " SELECT url, content_hash, question, normalized, answer, run_id, created_at FROM other.qa ORDER BY id"
+                )
+                self._conn.commit()
+            finally:
+                self._conn.execute("DETACH DATABASE other")
+            return self._conn.total_changes - before
+
+def _read_records(path: str) -> Iterator[Tuple[str, str, str, str]]:
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield (record.get("Sumber URL", ""), record.get("Hash Konten", ""),
+                           record.get("Pertanyaan", ""), record.get("Jawaban", ""))
+        return
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = csv.reader(f)
+        header = next(rows, None)
+        if header is None:
+            return
+        if "Pertanyaan" in header and "Jawaban" in header:
+            columns = {name: header.index(name) for name in ("Sumber URL", "Hash Konten", "Pertanyaan", "Jawaban") if name in header}
+
+            def get(row: List[str], name: str) -> str:
+                return row[columns[name]] if name in columns and columns[name] < len(row) else ""
+
+            for row in rows:
+                yield get(row, "Sumber URL"), get(row, "Hash Konten"), get(row, "Pertanyaan"), get(row, "Jawaban")
+            return
+        for row in [header, *rows]:
+            if len(row) >= 3:
+                yield row[0], "", row[1], row[2]
+            elif len(row) == 2:
+                yield "", "", row[0], row[1]
+
+_corpus: Optional[CorpusStore] = None
+_corpus_lock = threading.Lock()
+
+def get_corpus() -> CorpusStore:
+    """Mengembalikan korpus Q/A bersama untuk seluruh proses."""
+    global _corpus
+    with _corpus_lock:
+        if _corpus is None:
+            _corpus = CorpusStore(CORPUS_PATH)
+        return _corpus
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Mengelola korpus Q/A lokal (SQLite): impor, gabung, ekspor dan statistik.")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="Path file korpus SQLite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Impor file CSV/JSONL hasil run sebelumnya")
+    import_parser.add_argument("files", nargs="+")
+    merge_parser = commands.add_parser("merge", help="Gabungkan korpus SQLite lain tanpa duplikat")
+    merge_parser.add_argument("other")
+    export_parser = commands.add_parser("export", help="Ekspor korpus ke JSONL/CSV")
+    export_parser.add_argument("output", help="Nama dasar file hasil (tanpa ekstensi)")
+    export_parser.add_argument("--since", metavar="NAMA", help="Hanya baris baru sejak ekspor terakhir dengan nama ini")
+    export_parser.add_argument("--run", help="Hanya baris dari run tertentu")
+    export_parser.add_argument("--parquet", action="store_true", help="Tulis juga dataset Parquet (butuh pyarrow)")
+    commands.add_parser("stats", help="Tampilkan jumlah pasangan, URL dan run")
+    args = parser.parse_args(argv)
+
+    corpus = CorpusStore(args.corpus)
+    if args.command == "import":
+        for path in args.files:
+            logger.info("%s: %d pasangan baru", path, corpus.import_file(path))
+    elif args.command == "merge":
+        logger.info("%d pasangan baru dari %s", corpus.merge(args.other), args.other)
+    elif args.command == "export":
+        paths, count = corpus.export(args.output, name=args.since, run_id=args.run, parquet=args.parquet)
+        logger.info("%d pasangan diekspor ke %s", count, ", ".join(paths.values()))
+    else:
+        stats = corpus.stats()
+        logger.info("%d pasangan Q/A dari %d URL dalam %d run", stats["pairs"], stats["urls"], stats["runs"])
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
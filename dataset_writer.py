@@ -0,0 +1,93 @@
+import csv
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow bersifat opsional
+    pa = None
+    pq = None
+
+DEFAULT_FLUSH_EVERY = 50
+
+# Jumlah baris yang dibaca ulang dari file hasil untuk pratinjau di UI
+PREVIEW_ROWS = 200
+
+def parquet_available() -> bool:
+    return pq is not None
+
+class DatasetWriter:
+    """Menulis record Q/A secara inkremental begitu selesai, tanpa menampung seluruh dataset di memori.
+
+    Record ditulis per batch (flush_every) ke <base>.jsonl dan <base>.csv, dan opsional ke dataset
+    Parquet <base>_parquet/part-NNNNN.parquet. Hasil yang sudah di-flush tetap aman bila proses
+    terhenti di tengah jalan. File yang sudah ada ditimpa: run yang dilanjutkan dari checkpoint
+    mengirim ulang jawaban lamanya sehingga hasilnya tetap lengkap tanpa duplikat.
+    """
+
+    def __init__(self, base_path: str, fieldnames: List[str], parquet: bool = False,
+                 flush_every: int = DEFAULT_FLUSH_EVERY):
+        self.fieldnames = fieldnames
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self.paths: Dict[str, str] = {"jsonl": f"{base_path}.jsonl", "csv": f"{base_path}.csv"}
+        self._buffer: List[Dict] = []
+        self._parts = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(base_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._jsonl = open(self.paths["jsonl"], "w", encoding="utf-8")
+        self._csv_file = open(self.paths["csv"], "w", encoding="utf-8", newline="")
+        self._csv = csv.DictWriter(self._csv_file, fieldnames=fieldnames, extrasaction="ignore")
+        self._csv.writeheader()
+
+        if parquet and parquet_available():
+            self.paths["parquet"] = f"{base_path}_parquet"
+            os.makedirs(self.paths["parquet"], exist_ok=True)
+            for name in os.listdir(self.paths["parquet"]):
+                if name.startswith("part-") and name.endswith(".parquet"):
+                    os.remove(os.path.join(self.paths["parquet"], name))
+
+    def write(self, record: Dict):
+        """Menambahkan satu record; ditulis ke disk setiap flush_every record."""
+        with self._lock:
+            self._buffer.append(record)
+            self.count += 1
+            if len(self._buffer) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        for record in self._buffer:
+            self._jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._csv.writerow(record)
+        self._jsonl.flush()
+        self._csv_file.flush()
+        if "parquet" in self.paths:
+            table = pa.Table.from_pylist([{k: record.get(k) for k in self.fieldnames} for record in self._buffer])
+            pq.write_table(table, os.path.join(self.paths["parquet"], f"part-{self._parts:05d}.parquet"))
+            self._parts += 1
+        self._buffer = []
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._jsonl.close()
+            self._csv_file.close()
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> Optional[bool]:
+        self.close()
+        return None
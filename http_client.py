@@ -0,0 +1,58 @@
+import threading
+from typing import Dict
+
+import requests
+from openai import OpenAI, Timeout
+from requests.adapters import HTTPAdapter
+
+# Timeout koneksi dibuat pendek; timeout baca panjang karena completion LLM bisa lama
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 180.0
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# Ukuran pool minimum; diperbesar otomatis mengikuti jumlah permintaan paralel
+DEFAULT_POOL_SIZE = 10
+
+_lock = threading.Lock()
+_session = None
+_session_pool_size = 0
+_openai_clients: Dict[str, OpenAI] = {}
+
+def get_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """Mengembalikan satu requests.Session bersama (keep-alive) untuk seluruh proses."""
+    global _session, _session_pool_size
+    pool_size = max(pool_size, DEFAULT_POOL_SIZE)
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+        if pool_size > _session_pool_size:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session_pool_size = pool_size
+        return _session
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """GET melalui session bersama dengan timeout bawaan."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session().get(url, **kwargs)
+
+def http_post(url: str, **kwargs) -> requests.Response:
+    """POST melalui session bersama dengan timeout bawaan."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session().post(url, **kwargs)
+
+def get_openai_client(api_key: str) -> OpenAI:
+    """Mengembalikan client OpenAI bersama per API key, dengan pool koneksi keep-alive.
+
+    Timeout memakai tipe milik SDK (openai.Timeout) karena versi SDK yang berbeda membawa
+    implementasi httpx-nya sendiri; pool koneksi bawaan SDK (ratusan koneksi keep-alive)
+    sudah jauh di atas jumlah permintaan paralel pipeline.
+    """
+    with _lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            # Retry ditangani scheduler.RequestScheduler agar tidak berlipat ganda dengan retry bawaan SDK
+            client = OpenAI(api_key=api_key, max_retries=0, timeout=Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT))
+            _openai_clients[api_key] = client
+        return client
@@ -0,0 +1,57 @@
+import re
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from chunking import split_sections
+from corpus import content_hash
+from preclean import preclean
+from retrieval import PassageIndex
+
+_WHITESPACE = re.compile(r"\s+")
+
+def section_hash(section: str) -> str:
+    """Hash satu bagian halaman setelah pra-pembersihan; perubahan menu, iklan, boilerplate atau spasi saja tidak dianggap perubahan."""
+    return content_hash(_WHITESPACE.sub(" ", preclean(section)[0]).strip())
+
+class SectionDiff:
+    """Perbandingan bagian (per judul) halaman hasil scraping dengan versi yang sudah diproses.
+
+    known berisi hash bagian versi sebelumnya (CorpusStore.section_hashes); tanpa known semua
+    bagian dianggap baru. changed dapat diberikan langsung untuk memulihkan hasil perbandingan
+    dari checkpoint, sehingga run yang dilanjutkan memproses bagian yang sama.
+    """
+
+    def __init__(self, text: str, known: Optional[Iterable[str]] = None, changed: Optional[List[int]] = None):
+        self.text = text
+        self.sections = split_sections(text)
+        self.hashes = [section_hash(section) for section in self.sections]
+        if changed is not None:
+            self.changed = list(changed)
+        else:
+            known_set = set(known or ())
+            self.changed = [i for i, h in enumerate(self.hashes) if h not in known_set]
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.changed) == len(self.sections)
+
+    def unchanged_hashes(self) -> List[str]:
+        changed = set(self.changed)
+        return [h for i, h in enumerate(self.hashes) if i not in changed]
+
+    def delta_text(self) -> str:
+        """Teks yang perlu diproses: seluruh halaman bila semuanya baru, atau hanya bagian yang berubah."""
+        if self.is_full:
+            return self.text
+        return "\n\n".join(self.sections[i] for i in self.changed)
+
+    def attribute(self, questions: List[str]) -> List[str]:
+        """Hash bagian asal tiap pertanyaan: bagian berubah dengan skor BM25 tertinggi terhadap pertanyaan."""
+        candidates = self.changed or list(range(len(self.sections)))
+        if not candidates:
+            return [content_hash(self.text)] * len(questions)
+        if len(candidates) == 1:
+            return [self.hashes[candidates[0]]] * len(questions)
+        index = PassageIndex("", "bm25", passages=[self.sections[i] for i in candidates])
+        return [self.hashes[candidates[int(np.argmax(index.scores(question)))]] for question in questions]
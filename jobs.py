@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from llm_cache import CACHE_DIR
+from metrics import RunMetrics, start_run
+
+# Jumlah job yang berjalan bersamaan untuk seluruh pengguna dalam satu proses
+DEFAULT_JOB_WORKERS = int(os.environ.get("QA_JOB_WORKERS", "2"))
+# Hasil per run (job latar belakang maupun run langsung dari UI); di-gitignore, bukan di root repo
+JOB_OUTPUT_DIR = os.environ.get("QA_JOB_OUTPUT_DIR", "jobs")
+ACTIVE_STATUSES = ("queued", "running")
+# Jumlah RunMetrics job terakhir yang disimpan di memori untuk panel metrik
+MAX_RETAINED_METRICS = 100
+
+def job_key(kind: str, params: Dict[str, Any]) -> str:
+    """Kunci job dari jenis dan parameternya; job dengan kunci sama dianggap pekerjaan yang sama."""
+    return hashlib.sha256(json.dumps([kind, params], sort_keys=True).encode("utf-8")).hexdigest()
+
+class JobStore:
+    """Status job (antre, berjalan, selesai, gagal) beserta progres dan hasilnya di SQLite."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, key TEXT NOT NULL, kind TEXT NOT NULL, params TEXT NOT NULL,"
+            " status TEXT NOT NULL, progress REAL NOT NULL DEFAULT 0, message TEXT, result TEXT, error TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, updated_at)")
+        self._conn.commit()
+
+    def create(self, kind: str, key: str, params: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, key, kind, params, status, created_at, updated_at) VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, key, kind, json.dumps(params), now, now),
+            )
+            self._conn.commit()
+        return job_id
+
+    def update(self, job_id: str, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], ensure_ascii=False)
+        fields["updated_at"] = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?",
+                (*fields.values(), job_id),
+            )
+            self._conn.commit()
+
+    def _row_to_job(self, row) -> Dict[str, Any]:
+        job = dict(zip(
+            ("id", "key", "kind", "params", "status", "progress", "message", "result", "error", "created_at", "updated_at"), row
+        ))
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def find_reusable(self, key: str, max_age: float) -> Optional[Dict[str, Any]]:
+        """Job dengan kunci sama yang masih berjalan, atau sudah selesai dalam max_age detik terakhir."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE key = ? AND (status IN ('queued', 'running') OR (status = 'done' AND updated_at >= ?))"
+                " ORDER BY created_at DESC LIMIT 1",
+                (key, time.time() - max_age),
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def mark_interrupted(self):
+        """Job yang tertinggal dari proses sebelumnya tidak punya pekerja lagi; tandai gagal."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE status IN ('queued', 'running')",
+                ("Server dimulai ulang sebelum job selesai. Kirim ulang untuk melanjutkan dari checkpoint.", time.time()),
+            )
+            self._conn.commit()
+
+class JobQueue:
+    """Antrean job bersama untuk semua sesi: pool pekerja berukuran tetap dengan status di JobStore.
+
+    UI hanya mengirim job dan membaca progresnya, sehingga job tetap berjalan walau browser
+    terputus, dan total konkurensi dibatasi max_workers untuk semua pengguna. Job dengan parameter
+    yang sama dengan job yang masih berjalan (atau baru selesai) dipakai ulang, tidak dijalankan dua kali.
+    """
+
+    def __init__(self, store: JobStore, max_workers: int = DEFAULT_JOB_WORKERS):
+        self.store = store
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._submit_lock = threading.Lock()
+        self._metrics: Dict[str, RunMetrics] = {}
+
+    def submit(self, kind: str, params: Dict[str, Any],
+               runner: Callable[[str, Callable[[Optional[float], str], None]], Dict[str, Any]],
+               reuse_within: float = 0.0, key: Optional[str] = None) -> Tuple[str, bool]:
+        """Mengirim job; mengembalikan (id job, dipakai_ulang).
+
+        params harus bisa di-serialisasi JSON dan tidak boleh berisi rahasia (API key): nilainya
+        disimpan di disk dan menjadi kunci pemakaian ulang. runner(id_job, progress) dijalankan di
+        pool pekerja dan mengembalikan hasil (JSON); progress(fraksi atau None, pesan) memperbarui status.
+        key menggantikan job_key(kind, params) bila sebagian params tidak memengaruhi hasil.
+        """
+        key = key or job_key(kind, params)
+        with self._submit_lock:
+            existing = self.store.find_reusable(key, reuse_within)
+            if existing is not None:
+                return existing["id"], True
+            job_id = self.store.create(kind, key, params)
+        self._executor.submit(self._run, job_id, kind, params, runner)
+        return job_id, False
+
+    def _run(self, job_id: str, kind: str, params: Dict[str, Any], runner: Callable):
+        self.store.update(job_id, status="running", message="Memulai...")
+        run_metrics = start_run(f"job {job_id}", {"kind": kind, **params})
+
+        def progress(fraction: Optional[float], message: str):
+            if fraction is None:
+                self.store.update(job_id, message=message)
+            else:
+                self.store.update(job_id, progress=fraction, message=message)
+
+        try:
+            result = runner(job_id, progress)
+        except Exception as e:
+            self.store.update(job_id, status="failed", error=str(e))
+        else:
+            self.store.update(job_id, status="done", progress=1.0, message="Selesai", result=result)
+        finally:
+            run_metrics.finish()
+            run_metrics.save()
+            self._metrics[job_id] = run_metrics
+            while len(self._metrics) > MAX_RETAINED_METRICS:
+                self._metrics.pop(next(iter(self._metrics)))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def run_metrics(self, job_id: str) -> Optional[RunMetrics]:
+        """Metrik job yang sudah selesai di proses ini, bila masih tersimpan di memori."""
+        return self._metrics.get(job_id)
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Mengembalikan antrean job bersama untuk seluruh proses."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            store = JobStore(os.path.join(CACHE_DIR, "jobs.sqlite3"))
+            store.mark_interrupted()
+            _queue = JobQueue(store)
+        return _queue
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+CACHE_DIR = os.environ.get("QA_CACHE_DIR", ".cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class CompletionCache:
+    """Cache completion LLM di disk (SQLite), dialamatkan dengan hash isi permintaan.
+
+    Ukuran total dibatasi max_bytes; entri yang paling lama tidak diakses dibuang lebih dulu (LRU).
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_access ON completions (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(provider: str, request: Dict[str, Any]) -> str:
+        """Membuat kunci dari provider dan seluruh parameter permintaan (model, prompt/messages, sampling)."""
+        raw = json.dumps({"provider": provider, "request": request}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Membuang entri LRU sampai total ukuran berada di bawah max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM completions ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": total}
+
+_cache: Optional[CompletionCache] = None
+_cache_lock = threading.Lock()
+
+def get_completion_cache() -> CompletionCache:
+    """Mengembalikan cache completion bersama untuk seluruh proses."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CompletionCache(os.path.join(CACHE_DIR, "completions.sqlite3"))
+        return _cache
+
+def cached_completion(provider: str, request: Dict[str, Any], fetch: Callable[[], Optional[str]],
+                      use_cache: bool = True) -> Optional[str]:
+    """Mengambil completion dari cache, atau memanggil fetch lalu menyimpan hasilnya.
+
+    Hasil None (respons kosong) tidak disimpan sehingga akan dicoba ulang pada run berikutnya.
+    use_cache=False melewati cache hanya untuk panggilan ini (pengaturan per sesi atau job);
+    CompletionCache.enabled mematikannya untuk seluruh proses.
+    """
+    cache = get_completion_cache()
+    if not use_cache or not cache.enabled:
+        return fetch()
+
+    key = cache.make_key(provider, request)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = fetch()
+    if result is not None:
+        cache.set(key, result)
+    return result
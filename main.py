@@ -1,59 +1,36 @@
-import streamlit as st
-import requests
-import pandas as pd
-import time
-from openai import OpenAI
-from typing import List, Dict
-
-def initialize_session_state():
-    """Inisialisasi session state untuk menyimpan API keys dan pengaturan."""
-    # Inisialisasi API keys
-    if 'openai_api_key' not in st.session_state:
-        st.session_state.openai_api_key = ''
-    if 'jina_api_key' not in st.session_state:
-        st.session_state.jina_api_key = ''
-    
-    # Inisialisasi pengaturan model
-    if 'temperature' not in st.session_state:
-        st.session_state.temperature = 0.7
-    
-    # Inisialisasi status proses
-    if 'processing_status' not in st.session_state:
-        st.session_state.processing_status = ''
-
-def scrape_website(url: str, jina_api_key: str) -> str:
-    """Melakukan scraping website menggunakan Jina AI Reader API."""
-    try:
-        headers = {"Authorization": f"Bearer {jina_api_key}"}
-        response = requests.get(f"https://r.jina.ai/{url}", headers=headers)
-        response.raise_for_status()
-        return response.text
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error saat melakukan scraping website: {e}")
-        return ""
-
-def clean_data(text: str, openai_client, temperature: float) -> str:
-    """Membersihkan data hasil scraping menggunakan OpenAI."""
+import sys
+from typing import Callable, List, Optional
+
+from answering import batch_answer_instructions, format_batch_questions, parse_batch_answers
+from app_ui import run_app
+from backends import LLMRouter
+from question_dedup import strip_preamble
+from reporting import report_error, report_warning
+
+# Backend bawaan entry point ini; UI dan pipeline bersama ada di app_ui.py
+PROVIDER = "openai"
+
+def clean_chunk(text: str, llm: LLMRouter, temperature: float, on_token: Optional[Callable[[str], None]] = None) -> str:
+    """Membersihkan satu potongan data hasil scraping melalui backend LLM tahap "clean"."""
     prompt = f"Bersihkan teks berikut dan buat menjadi lebih terstruktur:\n\n{text}"
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "Kamu adalah asisten AI yang bertugas membersihkan dan menstrukturkan data teks."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature
+        content = llm.complete(
+            "clean",
+            prompt,
+            system="Kamu adalah asisten AI yang bertugas membersihkan dan menstrukturkan data teks.",
+            temperature=temperature,
+            on_token=on_token
         )
-        if response.choices and response.choices[0].message and response.choices[0].message.content:
-            return response.choices[0].message.content.strip()
+        if content:
+            return content
         else:
-            st.error("Tidak ada respons valid dari OpenAI.")
+            report_error("Tidak ada respons valid dari LLM.")
             return text
     except Exception as e:
-        st.error(f"Error saat membersihkan data: {e}")
+        report_error(f"Error saat membersihkan data: {e}")
         return text
 
-def generate_questions(document: str, openai_client, num_questions: int = 5, temperature: float = 0.7) -> List[str]:
+def generate_questions(document: str, llm: LLMRouter, num_questions: int = 5, temperature: float = 0.7) -> List[str]:
     """Menghasilkan pertanyaan berdasarkan dokumen yang diberikan sebagai konteks."""
     prompt = f"""Berdasarkan dokumen berikut, buatlah {num_questions} pertanyaan hukum yang mendetail tanpa kalimat pembuka atau penjelasan tambahan. Hanya tuliskan pertanyaannya langsung dalam format daftar:
 
@@ -63,32 +40,24 @@ def generate_questions(document: str, openai_client, num_questions: int = 5, tem
     """
 
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",  # Pastikan model ini sesuai dengan akun Anda
-            messages=[
-                {"role": "system", "content": "Anda adalah ahli hukum"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature
-        )
-        
-        content = response.choices[0].message.content if response.choices else None
+        content = llm.complete("questions", prompt, system="Anda adalah ahli hukum", temperature=temperature)
         
         if content is None:
-            st.warning("Respons dari API kosong. Menggunakan pertanyaan default.")
-            return [f"Pertanyaan default {i+1}" for i in range(num_questions)]
+            report_warning("Respons dari API kosong. Tidak ada pertanyaan yang dihasilkan.")
+            return []
         
         questions = content.strip().split('\n')
-        questions = [q.strip() for q in questions if q.strip()]
+        # Kalimat pembuka dari model tidak boleh memakan jatah pertanyaan
+        questions = strip_preamble(questions)
         
         return questions[:num_questions]
 
     except Exception as e:
-        st.error(f"Error saat menghasilkan pertanyaan: {e}")
-        return [f"Pertanyaan default {i+1}" for i in range(num_questions)]
+        report_error(f"Error saat menghasilkan pertanyaan: {e}")
+        return []
 
-def get_ai_answer(question: str, document: str, openai_client, temperature: float) -> str:
-    """Mendapatkan jawaban dari OpenAI berdasarkan dokumen yang diberikan dengan menggunakan GPT-4."""
+def get_ai_answer(question: str, document: str, llm: LLMRouter, temperature: float, on_token: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """Mendapatkan jawaban dari backend LLM tahap "answers" berdasarkan dokumen yang diberikan."""
     prompt = f"""Berdasarkan dokumen berikut:
 
     {document}
@@ -99,153 +68,50 @@ def get_ai_answer(question: str, document: str, openai_client, temperature: floa
     """
 
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",  # Pastikan model ini tersedia di akun OpenAI Anda
-            messages=[
-                {"role": "system", "content": "Anda adalah penyidik kepolisian ahli hukum pidana lex specialis di luar KUHP. Tugas Anda adalah memberikan jawaban yang rinci dan akurat berdasarkan dokumen yang disediakan."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature
+        content = llm.complete(
+            "answers",
+            prompt,
+            system="Anda adalah penyidik kepolisian ahli hukum pidana lex specialis di luar KUHP. Tugas Anda adalah memberikan jawaban yang rinci dan akurat berdasarkan dokumen yang disediakan.",
+            temperature=temperature,
+            on_token=on_token
         )
         
-        content = response.choices[0].message.content if response.choices else None
-        
         if content is None:
-            st.warning("Respons dari API kosong. Menggunakan jawaban default.")
-            return "Jawaban default"
+            report_warning("Respons dari API kosong. Pertanyaan ini dilewati.")
+            return None
         
-        return content.strip()
+        return content
 
     except Exception as e:
-        st.error(f"Error saat mendapatkan jawaban: {e}")
-        return "Jawaban default"
-
-def save_to_csv(qa_pairs: List[Dict], filename: str) -> str:
-    """Menyimpan pertanyaan dan jawaban ke file CSV."""
-    df = pd.DataFrame(qa_pairs)
-    csv_file = f"{filename}.csv"
-    df.to_csv(csv_file, index=False)
-    return csv_file
-
-def main():
-    # Inisialisasi session state
-    initialize_session_state()
-    
-    st.title("ZANDREGSS BOT")
-    st.write("Masukkan API keys dan URL untuk menjalankan.")
-
-    # Sidebar untuk input API keys dan pengaturan
-    with st.sidebar:
-        st.header("Konfigurasi")
-        
-        # API Keys section
-        st.subheader("API Keys")
-        openai_api_key = st.text_input("Masukkan OpenAI API Key:", type="password", key="openai_key_input")
-        jina_api_key = st.text_input("Masukkan Jina AI API Key:", type="password", key="jina_key_input")
-        
-        if st.button("Simpan API Keys"):
-            st.session_state.openai_api_key = openai_api_key
-            st.session_state.jina_api_key = jina_api_key
-            st.success("API Keys berhasil disimpan!")
-        
-        # Temperature setting
-        st.subheader("Pengaturan Model")
-        temperature = st.slider(
-            "Temperatur (Kreativitas)",
-            min_value=0.0,
-            max_value=2.0,
-            value=st.session_state.temperature,
-            step=0.1,
-            help="Semakin tinggi nilai (mendekati 2.0), semakin kreatif dan beragam hasilnya. Semakin rendah (mendekati 0), semakin konsisten dan fokus hasilnya."
+        report_error(f"Error saat mendapatkan jawaban: {e}")
+        return None
+
+def get_ai_answers_batch(questions: List[str], document: str, llm: LLMRouter, temperature: float) -> List[Optional[str]]:
+    """Menjawab beberapa pertanyaan sekaligus dalam satu permintaan LLM dengan respons JSON."""
+    prompt = f"""Berdasarkan dokumen berikut:
+
+    {document}
+
+    Jawab setiap pertanyaan berikut ini secara langsung tanpa kalimat pembuka atau penjelasan tambahan. Setiap jawaban harus merujuk pada pasal yang relevan dan elemen hukum yang diperlukan:
+
+    {format_batch_questions(questions)}
+
+    {batch_answer_instructions(len(questions))}
+    """
+
+    try:
+        content = llm.complete(
+            "answers",
+            prompt,
+            system="Anda adalah penyidik kepolisian ahli hukum pidana lex specialis di luar KUHP. Tugas Anda adalah memberikan jawaban yang rinci dan akurat berdasarkan dokumen yang disediakan.",
+            temperature=temperature,
+            json_mode=True
         )
-        st.session_state.temperature = temperature
-        
-        # Explanation of temperature
-        st.info("""
-        **Panduan Temperatur:**
-        - 0.0-0.3: Jawaban sangat konsisten dan faktual
-        - 0.4-0.7: Keseimbangan antara kreativitas dan konsistensi
-        - 0.8-1.2: Lebih kreatif dan beragam
-        - 1.3-2.0: Sangat kreatif dan eksploratif
-        """)
-
-    # Main content
-    website_url = st.text_input("Masukkan URL website:")
-    num_questions = st.number_input("Berapa banyak pertanyaan yang ingin dihasilkan?", min_value=1, max_value=20, value=5)
-
-    if st.button("Mulai Scraping"):
-        if not st.session_state.openai_api_key or not st.session_state.jina_api_key:
-            st.error("Mohon masukkan API keys terlebih dahulu di sidebar!")
-            return
-        
-        if not website_url:
-            st.error("Mohon masukkan URL yang valid!")
-            return
-
-        try:
-            # Inisialisasi OpenAI client dengan API key dari pengguna
-            openai_client = OpenAI(api_key=st.session_state.openai_api_key)
-            
-            # Progress container
-            progress_text = st.empty()
-            progress_bar = st.progress(0)
-            
-            # Step 1: Scraping
-            progress_text.text("Melakukan scraping website...")
-            progress_bar.progress(0.2)
-            scraped_data = scrape_website(website_url, st.session_state.jina_api_key)
-            
-            if scraped_data:
-                filename = f"scraped_data_{time.strftime('%Y%m%d-%H%M%S')}"
-                
-                # Step 2: Cleaning
-                progress_text.text("Membersihkan data...")
-                progress_bar.progress(0.4)
-                cleaned_data = clean_data(scraped_data, openai_client, st.session_state.temperature)
-
-                # Step 3: Generating questions
-                progress_text.text("Menghasilkan pertanyaan...")
-                progress_bar.progress(0.6)
-                questions = generate_questions(cleaned_data, openai_client, num_questions, st.session_state.temperature)
-
-                # Step 4: Generating answers
-                qa_pairs = []
-                total_questions = len(questions)
-                for i, question in enumerate(questions):
-                    progress_text.text(f"Menghasilkan jawaban untuk pertanyaan {i+1} dari {total_questions}...")
-                    progress = 0.6 + (0.4 * (i + 1) / total_questions)
-                    progress_bar.progress(progress)
-                    
-                    answer = get_ai_answer(question, cleaned_data, openai_client, st.session_state.temperature)
-                    qa_pairs.append({"Pertanyaan": question, "Jawaban": answer})
-
-                # Clear progress indicators
-                progress_text.empty()
-                progress_bar.empty()
-
-                st.success("Proses selesai!")
-                
-                # Menampilkan hasil dengan expander
-                with st.expander("Lihat Hasil", expanded=True):
-                    for i, qa in enumerate(qa_pairs, 1):
-                        st.markdown(f"**Q{i}: {qa['Pertanyaan']}**")
-                        st.markdown(f"A{i}: {qa['Jawaban']}")
-                        st.markdown("---")
-                
-                # Save to CSV
-                csv_file = save_to_csv(qa_pairs, filename)
-                
-                # Download button
-                st.download_button(
-                    "📥 Unduh Hasil (CSV)",
-                    data=open(csv_file, "rb"),
-                    file_name=f"{filename}.csv",
-                    mime="text/csv",
-                    help="Klik untuk mengunduh hasil dalam format CSV"
-                )
-
-        except Exception as e:
-            st.error(f"Terjadi kesalahan: {str(e)}")
+        return parse_batch_answers(content, len(questions))
+
+    except Exception as e:
+        report_warning(f"Error saat menjawab pertanyaan secara batch, pertanyaan akan ditanyakan satu per satu: {e}")
+        return [None] * len(questions)
 
 if __name__ == "__main__":
-    main()
+    run_app(sys.modules[__name__])
@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+# Harga per 1 juta token (prompt, completion) dalam USD; model yang tidak terdaftar dihitung 0
+MODEL_PRICES: Dict[str, tuple] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "Qwen/Qwen2.5-7B-Instruct-Turbo": (0.30, 0.30),
+}
+STAGES = ("scrape", "clean", "questions", "answers")
+PERCENTILES = (50, 95, 99)
+METRICS_DIR = "metrics"
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICES.get(model or "", (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+class RunMetrics:
+    """Catatan setiap panggilan API dalam satu run: waktu, antrean, retry, token dan biaya."""
+
+    def __init__(self, label: str = "", config: Optional[Dict[str, Any]] = None):
+        self.label = label
+        self.config = config or {}
+        self.started_at = time.time()
+        # Run yang dimulai pada detik yang sama (job paralel, sesi lain) tetap punya file metrik sendiri
+        self.run_id = uuid.uuid4().hex[:8]
+        self.finished_at: Optional[float] = None
+        self.calls: List[Dict] = []
+        self.precleaned: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, call: Dict):
+        with self._lock:
+            self.calls.append(call)
+
+    def record_preclean(self, report: Dict, llm_skipped: bool):
+        with self._lock:
+            self.precleaned.append({**report, "llm_skipped": llm_skipped})
+
+    def finish(self):
+        self.finished_at = time.time()
+
+    def summary(self) -> Dict:
+        """Total dan persentil per tahap, serta total keseluruhan run."""
+        with self._lock:
+            calls = list(self.calls)
+            precleaned = list(self.precleaned)
+        stages = {}
+        for stage in [s for s in STAGES if any(c["stage"] == s for c in calls)] + sorted(
+            {c["stage"] for c in calls} - set(STAGES)
+        ):
+            stage_calls = [c for c in calls if c["stage"] == stage]
+            wall = np.array([c["wall_time"] for c in stage_calls])
+            queue = np.array([c["queue_wait"] for c in stage_calls])
+            # Rentang waktu tahap aktif, dari panggilan pertama dimulai sampai panggilan terakhir selesai
+            active = max(c["started_at"] + c["wall_time"] for c in stage_calls) - min(c["started_at"] for c in stage_calls)
+            stages[stage] = {
+                "calls": len(stage_calls),
+                "errors": sum(1 for c in stage_calls if c["error"]),
+                "cached": sum(1 for c in stage_calls if c["cached"]),
+                "retries": sum(c["retries"] for c in stage_calls),
+                "hedged": sum(1 for c in stage_calls if c.get("hedge")),
+                "active_time": active,
+                "throughput": len(stage_calls) / active if active > 0 else 0.0,
+                "wall_time_total": float(wall.sum()),
+                "wall_time": {f"p{p}": float(np.percentile(wall, p)) for p in PERCENTILES},
+                "queue_wait_total": float(queue.sum()),
+                "queue_wait": {f"p{p}": float(np.percentile(queue, p)) for p in PERCENTILES},
+                "prompt_tokens": sum(c["prompt_tokens"] for c in stage_calls),
+                "completion_tokens": sum(c["completion_tokens"] for c in stage_calls),
+                "cost_usd": sum(c["cost_usd"] for c in stage_calls),
+            }
+        end = self.finished_at or time.time()
+        return {
+            "label": self.label,
+            "config": self.config,
+            "started_at": self.started_at,
+            "duration": end - self.started_at,
+            "calls": len(calls),
+            "retries": sum(s["retries"] for s in stages.values()),
+            "hedged": sum(s["hedged"] for s in stages.values()),
+            "prompt_tokens": sum(s["prompt_tokens"] for s in stages.values()),
+            "completion_tokens": sum(s["completion_tokens"] for s in stages.values()),
+            "cost_usd": sum(s["cost_usd"] for s in stages.values()),
+            "stages": stages,
+            "preclean": {
+                "pages": len(precleaned),
+                "tokens_before": sum(r["tokens_before"] for r in precleaned),
+                "tokens_after": sum(r["tokens_after"] for r in precleaned),
+                "llm_skipped": sum(1 for r in precleaned if r["llm_skipped"]),
+            },
+        }
+
+    def to_json(self) -> str:
+        with self._lock:
+            calls = list(self.calls)
+        return json.dumps({"summary": self.summary(), "calls": calls}, indent=2, ensure_ascii=False)
+
+    def default_path(self) -> str:
+        return os.path.join(METRICS_DIR, f"run_{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))}_{self.run_id}.json")
+
+    def save(self, path: Optional[str] = None) -> str:
+        """Menulis ringkasan dan seluruh catatan panggilan ke file JSON."""
+        path = path or self.default_path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        return path
+
+# Per konteks, bukan global: run yang berjalan bersamaan (job latar belakang, sesi lain) tidak saling tercampur.
+# Thread pekerja dari concurrency.py mewarisi konteks pemanggilnya.
+_current: ContextVar[Optional[RunMetrics]] = ContextVar("current_run", default=None)
+
+def start_run(label: str = "", config: Optional[Dict[str, Any]] = None) -> RunMetrics:
+    """Memulai pengumpulan metrik untuk run baru; panggilan berikutnya dicatat ke run ini.
+
+    config berisi pengaturan run (backend, konkurensi, dsb.) agar hasil antar run bisa dibandingkan.
+    """
+    run = RunMetrics(label, config)
+    _current.set(run)
+    return run
+
+def current_run() -> Optional[RunMetrics]:
+    return _current.get()
+
+@contextmanager
+def track_call(stage: str, provider: str, model: Optional[str] = None, hedge: bool = False) -> Iterator[Dict]:
+    """Mengukur satu panggilan API dan mencatatnya ke run yang sedang berjalan.
+
+    hedge menandai permintaan cadangan yang dikirim ke backend alternatif (backends.LLMRouter).
+
+    Dict yang di-yield diisi oleh pemanggil dan scheduler: "queue_wait", "retries" dan "attempts"
+    (oleh RequestScheduler.call), serta "prompt_tokens"/"completion_tokens" dari field usage.
+    Panggilan tanpa "attempts" berarti dilayani dari cache tanpa menyentuh API.
+    """
+    call: Dict = {"queue_wait": 0.0, "retries": 0}
+    started_at = time.time()
+    started = time.monotonic()
+    error = None
+    try:
+        yield call
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        run = _current.get()
+        if run is not None:
+            prompt_tokens = int(call.get("prompt_tokens") or 0)
+            completion_tokens = int(call.get("completion_tokens") or 0)
+            run.record({
+                "stage": stage,
+                "provider": provider,
+                "model": model,
+                "started_at": started_at,
+                "wall_time": time.monotonic() - started,
+                "queue_wait": call["queue_wait"],
+                "retries": call["retries"],
+                "cached": "attempts" not in call,
+                "hedge": hedge,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+                "error": error,
+            })
+
+def record_preclean(report: Dict, llm_skipped: bool):
+    """Mencatat laporan pra-pembersihan satu dokumen (preclean.preclean) ke run yang sedang berjalan."""
+    run = _current.get()
+    if run is not None:
+        run.record_preclean(report, llm_skipped)
+
+def preclean_summary(summary: Dict) -> str:
+    """Ringkasan satu baris penghematan token pra-pembersihan dari RunMetrics.summary()."""
+    data = summary["preclean"]
+    if not data["pages"]:
+        return ""
+    saved = 1 - data["tokens_after"] / data["tokens_before"] if data["tokens_before"] else 0.0
+    return (
+        f"Pra-pembersihan {data['pages']} dokumen: {data['tokens_before']} → {data['tokens_after']} token "
+        f"(-{saved:.0%}), {data['llm_skipped']} tanpa pembersihan LLM"
+    )
+
+def summary_rows(summary: Dict) -> List[Dict]:
+    """Baris tabel per tahap dari RunMetrics.summary() untuk ditampilkan di UI atau log."""
+    return [
+        {
+            "Tahap": stage,
+            "Panggilan": data["calls"],
+            "Cache": data["cached"],
+            "Error": data["errors"],
+            "Retry": data["retries"],
+            "Hedge": data["hedged"],
+            "p50 (s)": round(data["wall_time"]["p50"], 2),
+            "p95 (s)": round(data["wall_time"]["p95"], 2),
+            "Antrean p95 (s)": round(data["queue_wait"]["p95"], 2),
+            "Token prompt": data["prompt_tokens"],
+            "Token completion": data["completion_tokens"],
+            "Biaya (USD)": round(data["cost_usd"], 4),
+        }
+        for stage, data in summary["stages"].items()
+    ]
@@ -0,0 +1,208 @@
+import re
+from typing import Dict, List, Set, Tuple
+
+from chunking import estimate_tokens
+
+# Mode tahap pembersihan: pra-pembersihan lokal selalu dijalankan, pembersihan LLM sesuai mode
+CLEAN_MODES = {
+    "llm": "Pra-pembersihan lokal + LLM",
+    "auto": "Lewati LLM bila halaman sudah bersih",
+    "local": "Hanya pembersihan lokal (tanpa LLM)",
+}
+# Porsi karakter berupa kalimat/paragraf minimal agar halaman dianggap cukup bersih untuk mode "auto"
+CLEAN_ENOUGH_RATIO = 0.85
+# Jumlah minimal baris navigasi berturut-turut (daftar yang isinya hanya tautan) yang dibuang
+MIN_NAV_RUN = 3
+
+_JINA_METADATA = re.compile(r"^(?:URL Source|Published Time|Markdown Content|Warning):.*$", re.MULTILINE)
+_JINA_TITLE = re.compile(r"^Title:\s*(.+)$", re.MULTILINE)
+_LINKED_IMAGE = re.compile(r"\[!\[[^\]]*\]\([^)]*\)\]\([^)]*\)")
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\((?:[^()\s]|\([^)]*\))*(?:\s+\"[^\"]*\")?\)")
+_BARE_URL_LINE = re.compile(r"^\s*(?:[-*+]\s+)?<?https?://\S+>?\s*$")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_SEPARATOR = re.compile(r"^\s*(?:[-*_=]\s*){3,}$")
+# Footer/banner yang dikenali hanya bila satu baris utuh cocok dan baris itu berada di tepi halaman
+_BOILERPLATE = re.compile(
+    r"(?:hak cipta|copyright)?\s*(?:©|\(c\)).*|.*(?:all rights reserved|hak cipta dilindungi undang-undang)\.?|"
+    r"(?:kebijakan privasi|privacy policy|syarat dan ketentuan|terms of (?:use|service)|kebijakan cookie|cookie policy)"
+    r"(?:\s*[|·•]\s*[^|·•]+)*\.?|"
+    r"(?:situs|website|kami) (?:ini )?menggunakan (?:cookie|kuki)\b.*|(?:this (?:site|website)|we) uses? cookies\b.*|"
+    r"(?:berlangganan|subscribe)(?: (?:newsletter|sekarang|now))?[.!]?|newsletter|"
+    r"(?:bagikan(?: ke| artikel)?|share(?: this| on)?|ikuti kami(?: di)?|follow us(?: on)?)\s*:?(?:\s+\w+){0,6}|"
+    r"(?:unduh aplikasi|download (?:the )?app)\b.*|masuk|login|daftar|sign in|sign up|register|"
+    r"(?:tags?|baca juga|lihat juga|related)\s*:.*",
+    re.IGNORECASE,
+)
+_BOILERPLATE_MAX_CHARS = 200
+_PROSE_MIN_WORDS = 6
+_WHITESPACE = re.compile(r"\s+")
+
+def _is_nav_line(line: str) -> bool:
+    """Butir daftar yang isinya hanya satu atau beberapa tautan pendek (menu, tag, tautan terkait)."""
+    if not _LIST_ITEM.match(line) and not line.strip().startswith("["):
+        return False
+    rest = _LINK.sub("", _LIST_ITEM.sub("", line, count=1)).strip(" |·•-")
+    return bool(_LINK.search(line)) and not rest
+
+def _is_heading(line: str) -> bool:
+    return line.lstrip().startswith("#")
+
+def _is_boilerplate(line: str) -> bool:
+    stripped = _LIST_ITEM.sub("", _LINK.sub(r"\1", line).strip(), count=1).lstrip("#").strip()
+    return bool(stripped) and len(stripped) <= _BOILERPLATE_MAX_CHARS and bool(_BOILERPLATE.fullmatch(stripped))
+
+def _is_paragraph(line: str) -> bool:
+    text = _LINK.sub(r"\1", line).strip()
+    return (
+        len(text.split()) >= _PROSE_MIN_WORDS and "|" not in text
+        and not _is_heading(line) and not _is_nav_line(line) and not _is_boilerplate(line)
+    )
+
+def _body_range(lines: List[str]) -> Tuple[int, int]:
+    """Indeks baris pertama (judul/paragraf pertama) dan terakhir (paragraf terakhir) isi halaman.
+
+    Baris di luar rentang ini adalah tepi halaman (header, menu, footer). Halaman tanpa paragraf
+    dianggap isi seluruhnya agar tidak ada yang terbuang.
+    """
+    headings = [i for i, line in enumerate(lines) if _is_heading(line) and not _is_boilerplate(line)]
+    paragraphs = [i for i, line in enumerate(lines) if _is_paragraph(line)]
+    if not paragraphs:
+        return 0, len(lines) - 1
+    return min(headings[:1] + paragraphs[:1]), paragraphs[-1]
+
+def _nav_runs(lines: List[str]) -> List[Tuple[int, int]]:
+    """Rentang (awal, akhir) tiap deret ≥ MIN_NAV_RUN baris navigasi berturut-turut."""
+    runs, start = [], None
+    for i, line in enumerate(lines + [""]):
+        if _is_nav_line(line):
+            start = i if start is None else start
+            continue
+        if start is not None and i - start >= MIN_NAV_RUN:
+            runs.append((start, i - 1))
+        start = None
+    return runs
+
+def _under_heading(lines: List[str], start: int) -> bool:
+    """Deret tautan yang langsung dibuka judul bagian (mis. "Dasar Hukum") adalah isi, bukan menu."""
+    previous = next((line for line in reversed(lines[:start]) if line.strip()), "")
+    return _is_heading(previous) and not _is_boilerplate(previous)
+
+def _edge_nav_lines(lines: List[str], body: Tuple[int, int]) -> Set[int]:
+    """Baris menu yang dibuang: deret tautan yang berulang di halaman, atau yang berada di tepi halaman."""
+    runs = _nav_runs(lines)
+    keys = [tuple(_WHITESPACE.sub(" ", _LINK.sub(r"\1", line)).strip().lower() for line in lines[a:b + 1]) for a, b in runs]
+    dropped = set()
+    for (start, end), key in zip(runs, keys):
+        at_edge = (end < body[0] or start > body[1]) and not _under_heading(lines, start)
+        if keys.count(key) > 1 or at_edge:
+            dropped.update(range(start, end + 1))
+    return dropped
+
+def prose_ratio(text: str) -> float:
+    """Porsi karakter teks berupa kalimat (baris ≥ 6 kata) atau judul; sisanya dianggap sisa menu/markup."""
+    total = prose = 0
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        total += len(stripped)
+        if stripped.startswith("#"):
+            # Judul bagian wajar ada di dokumen bersih; tidak dihitung sebagai sisa markup
+            prose += len(stripped)
+        elif len(stripped.split()) >= _PROSE_MIN_WORDS and "|" not in stripped:
+            prose += len(stripped)
+    return prose / total if total else 1.0
+
+def preclean(text: str) -> Tuple[str, Dict]:
+    """Pembersihan lokal yang deterministik sebelum teks dikirim ke LLM.
+
+    Membuang metadata Jina, gambar, URL polos dan blok paragraf yang berulang, serta meringkas
+    tautan markdown menjadi teks tautannya. Menu (deret tautan) dan baris footer/banner (cookie,
+    hak cipta, ajakan berlangganan/berbagi) hanya dibuang di tepi halaman, yaitu sebelum judul
+    atau paragraf pertama dan setelah paragraf terakhir; menu yang berulang dibuang di mana pun. Mengembalikan (teks, laporan); laporan
+    berisi ukuran sebelum/sesudah, jumlah yang dibuang per jenis dan "clean_enough" untuk mode "auto".
+    """
+    report = {"chars_before": len(text), "tokens_before": estimate_tokens(text) if text else 0}
+
+    header = []
+    title = _JINA_TITLE.search(text[:1000])
+    if title and text.lstrip().startswith("Title:"):
+        # Judul Jina bukan bagian halaman; tepi halaman dihitung dari judul/paragraf pertama isinya
+        header = [f"# {title.group(1).strip()}", ""]
+        text = _JINA_TITLE.sub("", text, count=1)
+    text = _JINA_METADATA.sub("", text)
+
+    images = len(_LINKED_IMAGE.findall(text))
+    text = _LINKED_IMAGE.sub("", text)
+    images += len(_IMAGE.findall(text))
+    text = _IMAGE.sub("", text)
+
+    lines = text.splitlines()
+    body = _body_range(lines)
+    nav = _edge_nav_lines(lines, body)
+    links = 0
+    boilerplate = 0
+    kept_lines = list(header)
+    for i, line in enumerate(lines):
+        if i in nav:
+            continue
+        if _BARE_URL_LINE.match(line) or _SEPARATOR.match(line):
+            boilerplate += 1
+            continue
+        if not body[0] <= i <= body[1] and _is_boilerplate(line):
+            boilerplate += 1
+            continue
+        line, count = _LINK.subn(r"\1", line)
+        links += count
+        stripped = _LIST_ITEM.sub("", line.strip(), count=1).strip()
+        if line.strip() and not stripped.strip("*_|#>-· "):
+            # Sisa baris kosong setelah tautan/gambar dibuang, mis. "* " atau "| |"
+            continue
+        kept_lines.append(line.rstrip())
+
+    # Blok (paragraf) yang sama persis muncul lagi, mis. footer/sidebar berulang, hanya disimpan sekali
+    blocks, seen, duplicates, previous = [], set(), 0, ""
+    for block in re.split(r"\n\s*\n", "\n".join(kept_lines)):
+        block = block.strip("\n")
+        key = _WHITESPACE.sub(" ", block).strip().lower()
+        if not key:
+            continue
+        # Judul yang sama boleh muncul lagi di bagian lain, kecuali tepat berurutan (judul Jina + H1 halaman)
+        if key in seen and (not key.startswith("#") or key == previous):
+            duplicates += 1
+            continue
+        seen.add(key)
+        previous = key
+        blocks.append(block)
+    cleaned = "\n\n".join(blocks)
+
+    report.update({
+        "chars_after": len(cleaned),
+        "tokens_after": estimate_tokens(cleaned) if cleaned else 0,
+        "images": images,
+        "links": links,
+        "nav_lines": len(nav),
+        "boilerplate_lines": boilerplate,
+        "duplicate_blocks": duplicates,
+    })
+    report["reduction"] = 1 - report["chars_after"] / report["chars_before"] if report["chars_before"] else 0.0
+    report["clean_enough"] = prose_ratio(cleaned) >= CLEAN_ENOUGH_RATIO
+    return cleaned, report
+
+def needs_llm_cleaning(report: Dict, mode: str) -> bool:
+    """Apakah pembersihan LLM tetap dijalankan setelah pra-pembersihan, sesuai mode CLEAN_MODES."""
+    if mode not in CLEAN_MODES:
+        raise ValueError(f"Mode pembersihan tidak dikenal: {mode}")
+    if mode == "local":
+        return False
+    return mode == "llm" or not report["clean_enough"]
+
+def format_report(report: Dict) -> str:
+    """Ringkasan satu baris laporan pra-pembersihan untuk UI atau log."""
+    return (
+        f"Pra-pembersihan: {report['tokens_before']} → {report['tokens_after']} token "
+        f"(-{report['reduction']:.0%}); dibuang {report['images']} gambar, {report['nav_lines']} baris navigasi, "
+        f"{report['boilerplate_lines']} baris boilerplate, {report['duplicate_blocks']} blok berulang; "
+        f"{report['links']} tautan diringkas"
+    )
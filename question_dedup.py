@@ -0,0 +1,170 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from llm_cache import CACHE_DIR
+from scrape_cache import normalize_url
+
+NUM_PERMUTATIONS = 64
+SHINGLE_SIZE = 4
+DEFAULT_SIMILARITY_THRESHOLD = 0.6
+
+_NUMBERING = re.compile(r"^\s*(?:[-*•]|\(?\d+[.)]|[a-zA-Z][.)])\s*")
+_NON_WORD = re.compile(r"[^\w]+")
+_NUMBERS = re.compile(r"\d+")
+_PREAMBLE_START = re.compile(r"^(?:berikut|tentu|baik|oke|sure|here\s+(?:are|is))\b", re.IGNORECASE)
+
+# Koefisien hash universal (multiply-shift) yang tetap, agar signature di indeks persisten tetap valid antar proses
+_rng = np.random.default_rng(20241018)
+_HASH_A = _rng.integers(1, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_HASH_B = _rng.integers(0, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64)
+
+def strip_question_numbering(line: str) -> str:
+    """Menghapus penomoran/bullet di awal baris ("1. ", "- ", "a) ")."""
+    return _NUMBERING.sub("", line, count=1).strip()
+
+def is_preamble(line: str) -> bool:
+    """Baris pembuka/penutup dari model (mis. "Berikut 5 pertanyaan hukum:") yang bukan pertanyaan."""
+    text = strip_question_numbering(line)
+    if not text or text.endswith(":"):
+        return True
+    return "?" not in text and bool(_PREAMBLE_START.match(text))
+
+def strip_preamble(lines: List[str]) -> List[str]:
+    """Membuang baris kosong dan kalimat pembuka dari daftar pertanyaan hasil model."""
+    return [line.strip() for line in lines if line.strip() and not is_preamble(line)]
+
+def normalize_question(question: str) -> str:
+    return _NON_WORD.sub(" ", strip_question_numbering(question).lower()).strip()
+
+def _number_key(normalized: str) -> str:
+    # Pertanyaan yang hanya berbeda nomor pasal/undang-undang bukan duplikat
+    return " ".join(sorted(set(_NUMBERS.findall(normalized))))
+
+def minhash_signature(question: str) -> np.ndarray:
+    """Signature MinHash dari shingle karakter pertanyaan yang sudah dinormalisasi."""
+    text = normalize_question(question)
+    if len(text) <= SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # Overflow uint64 disengaja: multiply-shift hashing modulo 2^64
+    with np.errstate(over="ignore"):
+        permuted = (hashes[:, None] * _HASH_A + _HASH_B) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+def dedupe_questions(questions: List[str], threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> Tuple[List[str], List[str]]:
+    """Membuang pertanyaan yang mirip dengan pertanyaan sebelumnya dalam daftar yang sama.
+
+    Mengembalikan (dipertahankan, dibuang); urutan pertanyaan yang dipertahankan tidak berubah.
+    """
+    kept, dropped = [], []
+    signatures = np.empty((0, NUM_PERMUTATIONS), dtype=np.uint32)
+    number_keys: List[str] = []
+    for question in questions:
+        signature = minhash_signature(question)
+        key = _number_key(normalize_question(question))
+        same_numbers = np.array([k == key for k in number_keys], dtype=bool)
+        if same_numbers.any() and ((signatures == signature).mean(axis=1)[same_numbers] >= threshold).any():
+            dropped.append(question)
+            continue
+        kept.append(question)
+        signatures = np.vstack([signatures, signature])
+        number_keys.append(key)
+    return kept, dropped
+
+class QuestionIndex:
+    """Indeks persisten (SQLite) pertanyaan yang pernah dihasilkan, beserta signature MinHash-nya.
+
+    Signature dimuat ke satu matriks NumPy sehingga satu pertanyaan baru dibandingkan dengan
+    seluruh riwayat dalam satu operasi vektor.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            " url TEXT NOT NULL, normalized TEXT NOT NULL, question TEXT NOT NULL,"
+            " signature BLOB NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (url, normalized))"
+        )
+        self._conn.commit()
+        rows = self._conn.execute("SELECT url, normalized, signature FROM questions").fetchall()
+        self._keys = {(row[0], row[1]) for row in rows}
+        self._urls = np.array([row[0] for row in rows], dtype=object)
+        self._number_keys = np.array([_number_key(row[1]) for row in rows], dtype=object)
+        self._signatures = np.array(
+            [np.frombuffer(row[2], dtype=np.uint32) for row in rows], dtype=np.uint32
+        ).reshape(len(rows), NUM_PERMUTATIONS)
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def filter(self, url: str, questions: List[str], threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+               use_history: bool = True) -> Tuple[List[str], List[str]]:
+        """Membuang near-duplicate di dalam daftar dan, bila use_history, terhadap pertanyaan URL lain.
+
+        Pertanyaan yang dipertahankan langsung dicatat ke indeks. Riwayat URL yang sama diabaikan
+        agar menjalankan ulang satu URL tetap menghasilkan pertanyaan. Mengembalikan (dipertahankan, dibuang).
+        """
+        key = normalize_url(url)
+        kept, dropped = dedupe_questions(questions, threshold)
+        if not kept:
+            return kept, dropped
+
+        signatures = np.array([minhash_signature(q) for q in kept], dtype=np.uint32)
+        number_keys = [_number_key(normalize_question(q)) for q in kept]
+        with self._lock:
+            if use_history and len(self._urls):
+                others = self._urls != key
+                unique = []
+                for question, signature, number_key in zip(kept, signatures, number_keys):
+                    candidates = others & (self._number_keys == number_key)
+                    if candidates.any() and ((self._signatures[candidates] == signature).mean(axis=1) >= threshold).any():
+                        dropped.append(question)
+                    else:
+                        unique.append((question, signature, number_key))
+            else:
+                unique = list(zip(kept, signatures, number_keys))
+
+            new = [item for item in unique if (key, normalize_question(item[0])) not in self._keys]
+            if new:
+                now = time.time()
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO questions (url, normalized, question, signature, created_at) VALUES (?, ?, ?, ?, ?)",
+                    [(key, normalize_question(q), q, signature.tobytes(), now) for q, signature, _ in new],
+                )
+                self._conn.commit()
+                self._keys.update((key, normalize_question(q)) for q, _, _ in new)
+                self._urls = np.concatenate([self._urls, np.array([key] * len(new), dtype=object)])
+                self._number_keys = np.concatenate([self._number_keys, np.array([k for _, _, k in new], dtype=object)])
+                self._signatures = np.vstack([self._signatures, np.array([s for _, s, _ in new], dtype=np.uint32)])
+        return [q for q, _, _ in unique], dropped
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM questions")
+            self._conn.commit()
+            self._keys = set()
+            self._urls = np.array([], dtype=object)
+            self._number_keys = np.array([], dtype=object)
+            self._signatures = np.empty((0, NUM_PERMUTATIONS), dtype=np.uint32)
+
+_index: Optional[QuestionIndex] = None
+_index_lock = threading.Lock()
+
+def get_question_index() -> QuestionIndex:
+    """Mengembalikan indeks pertanyaan bersama untuk seluruh proses."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = QuestionIndex(os.path.join(CACHE_DIR, "questions.sqlite3"))
+        return _index
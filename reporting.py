@@ -0,0 +1,23 @@
+import logging
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+logger = logging.getLogger("streamlitqa")
+
+def _in_streamlit() -> bool:
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+def report_error(message: str):
+    """Menampilkan error di UI Streamlit, atau ke log bila berjalan tanpa Streamlit (mis. CLI)."""
+    if _in_streamlit():
+        st.error(message)
+    else:
+        logger.error(message)
+
+def report_warning(message: str):
+    """Menampilkan peringatan di UI Streamlit, atau ke log bila berjalan tanpa Streamlit (mis. CLI)."""
+    if _in_streamlit():
+        st.warning(message)
+    else:
+        logger.warning(message)
@@ -0,0 +1,100 @@
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from chunking import split_markdown
+
+# Mode pemilihan konteks untuk get_ai_answer; "full" mempertahankan perilaku lama (seluruh dokumen)
+RETRIEVAL_MODES = {
+    "full": "Dokumen lengkap",
+    "bm25": "BM25 (passage paling relevan)",
+    "tfidf": "TF-IDF (passage paling relevan)",
+}
+DEFAULT_TOP_K = 4
+PASSAGE_TOKENS = 250
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+class PassageIndex:
+    """Indeks passage per dokumen (BM25 atau TF-IDF) berbasis NumPy, tanpa dependensi jaringan.
+
+    Dibangun sekali setelah clean_data; context_for mengembalikan top-k passage untuk satu
+    pertanyaan, disusun kembali sesuai urutan kemunculannya di dokumen. passages dapat diberikan
+    langsung (mis. bagian per judul) sebagai pengganti pemotongan otomatis.
+    """
+
+    def __init__(self, document: str, mode: str = "bm25", passage_tokens: int = PASSAGE_TOKENS,
+                 k1: float = 1.5, b: float = 0.75, passages: Optional[List[str]] = None):
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Mode retrieval tidak dikenal: {mode}")
+        self.document = document
+        self.mode = mode
+        if passages is not None:
+            self.passages = passages
+        else:
+            self.passages = split_markdown(document, passage_tokens) if mode != "full" else [document]
+        if mode == "full" or len(self.passages) <= 1:
+            return
+
+        self.vocab: Dict[str, int] = {}
+        rows = []
+        for passage in self.passages:
+            counts: Dict[int, int] = {}
+            for token in tokenize(passage):
+                j = self.vocab.setdefault(token, len(self.vocab))
+                counts[j] = counts.get(j, 0) + 1
+            rows.append(counts)
+
+        tf = np.zeros((len(self.passages), len(self.vocab)), dtype=np.float32)
+        for i, counts in enumerate(rows):
+            if counts:
+                tf[i, list(counts)] = list(counts.values())
+
+        n = len(self.passages)
+        df = np.count_nonzero(tf, axis=0)
+        if mode == "bm25":
+            lengths = tf.sum(axis=1)
+            norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+            self.idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+            self.weights = tf * (k1 + 1) / (tf + norm[:, None])
+        else:
+            self.idf = np.log((1 + n) / (1 + df)) + 1
+            weights = tf * self.idf
+            self.weights = weights / np.maximum(np.linalg.norm(weights, axis=1, keepdims=True), 1e-9)
+
+    def scores(self, question: str) -> np.ndarray:
+        query = np.zeros(len(self.vocab), dtype=np.float32)
+        for token in tokenize(question):
+            j = self.vocab.get(token)
+            if j is not None:
+                query[j] += 1
+        if self.mode == "bm25":
+            return self.weights @ (np.minimum(query, 1) * self.idf)
+        query *= self.idf
+        return self.weights @ (query / max(np.linalg.norm(query), 1e-9))
+
+    def context_for(self, question: str, top_k: int = DEFAULT_TOP_K) -> str:
+        """Mengembalikan konteks untuk pertanyaan: dokumen lengkap, atau top-k passage paling relevan."""
+        if self.mode == "full" or len(self.passages) <= top_k:
+            return self.document
+        scores = self.scores(question)
+        if not scores.any():
+            return self.document
+        best = np.argsort(-scores, kind="stable")[:top_k]
+        return "\n\n".join(self.passages[i] for i in sorted(best))
+
+    def context_for_many(self, questions: List[str], top_k: int = DEFAULT_TOP_K) -> str:
+        """Konteks gabungan untuk beberapa pertanyaan: gabungan top-k passage masing-masing pertanyaan."""
+        if self.mode == "full" or len(self.passages) <= top_k:
+            return self.document
+        selected = set()
+        for question in questions:
+            scores = self.scores(question)
+            if not scores.any():
+                return self.document
+            selected.update(np.argsort(-scores, kind="stable")[:top_k].tolist())
+        return "\n\n".join(self.passages[i] for i in sorted(selected))
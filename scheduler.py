@@ -0,0 +1,218 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+# Batas bawaan per provider: (permintaan per menit, token per menit); 0 berarti tanpa batas
+DEFAULT_LIMITS: Dict[str, Tuple[int, int]] = {
+    "openai": (500, 200_000),
+    "together": (600, 180_000),
+    "jina": (200, 0),
+}
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+class TokenBucket:
+    """Token bucket thread-safe: kapasitas per menit yang terisi ulang secara merata."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+        # Membangunkan thread yang sedang menunggu di acquire begitu batas diubah
+        self._resized = threading.Condition(self._lock)
+
+    def resize(self, per_minute: float):
+        """Mengubah kapasitas tanpa mengisi ulang bucket: token yang sudah terpakai tetap terhitung."""
+        with self._lock:
+            now = time.monotonic()
+            if self.capacity > 0:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            else:
+                # Sebelumnya tanpa batas: mulai dari penuh seperti bucket baru
+                self.tokens = float(per_minute)
+            self.updated = now
+            self.capacity = float(per_minute)
+            self.rate = per_minute / 60.0
+            self.tokens = min(self.tokens, self.capacity)
+            self._resized.notify_all()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Menunggu sampai amount tersedia; mengembalikan lama menunggu (detik)."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                # Dicek ulang tiap putaran: batas bisa diubah (mis. ke 0 = tanpa batas) selagi menunggu
+                if self.capacity <= 0:
+                    return waited
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # Permintaan yang lebih besar dari kapasitas tetap boleh lewat setelah bucket penuh
+                needed = min(amount, self.capacity)
+                if self.tokens >= needed:
+                    self.tokens -= needed
+                    return waited
+                delay = (needed - self.tokens) / self.rate
+                started = time.monotonic()
+                self._resized.wait(delay)
+                waited += time.monotonic() - started
+
+class RetryBudget:
+    """Membatasi jumlah retry relatif terhadap permintaan yang berhasil agar retry tidak memperparah overload."""
+
+    def __init__(self, ratio: float = 0.2, minimum: int = 10):
+        self.ratio = ratio
+        self.balance = float(minimum)
+        self.minimum = minimum
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.balance = min(self.balance + self.ratio, self.minimum + 100 * self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    return status
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    # openai.APIConnectionError / APITimeoutError tanpa perlu mengimpor openai di sini
+    if type(error).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+    return _status_code(error) in RETRYABLE_STATUS
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Membaca header Retry-After / retry-after-ms dari respons error, bila ada."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+class RequestScheduler:
+    """Penjadwal permintaan per provider: batas RPM/TPM, retry dengan backoff eksponensial + jitter,
+    dukungan Retry-After dan anggaran retry.
+
+    Saat satu permintaan terkena 429, semua permintaan ke provider yang sama ikut ditahan sampai
+    waktu Retry-After lewat, sehingga throughput bertahan di batas alih-alih runtuh menjadi error.
+    """
+
+    def __init__(self, name: str, rpm: int, tpm: int, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = RetryBudget()
+        self.rpm, self.tpm = rpm, tpm
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, rpm: int, tpm: int):
+        """Mengubah batas RPM/TPM; isi bucket saat ini dipertahankan agar perubahan batas
+        (mis. dari sesi lain) tidak memberi jatah penuh baru yang bisa melampaui batas provider."""
+        self.rpm, self.tpm = rpm, tpm
+        self.requests.resize(rpm)
+        self.tokens.resize(tpm)
+
+    def _wait_for_pause(self) -> float:
+        with self._lock:
+            delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+            return delay
+        return 0.0
+
+    def _pause(self, delay: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def call(self, fn: Callable[[], Any], estimated_tokens: int = 0, max_retries: Optional[int] = None,
+             stats: Optional[Dict[str, Any]] = None) -> Any:
+        """Menjalankan fn di bawah batas rate, mengulang bila terjadi error sementara (429/5xx/koneksi).
+
+        Bila stats diberikan, lama menunggu antrean/backoff ("queue_wait"), jumlah retry ("retries")
+        dan jumlah percobaan ("attempts") ditambahkan ke dict tersebut.
+        """
+        retries = self.max_retries if max_retries is None else max_retries
+        stats = stats if stats is not None else {}
+        stats.setdefault("queue_wait", 0.0)
+        attempt = 0
+        while True:
+            stats["queue_wait"] += self._wait_for_pause()
+            stats["queue_wait"] += self.requests.acquire(1)
+            stats["queue_wait"] += self.tokens.acquire(estimated_tokens)
+            stats["attempts"] = attempt + 1
+            stats["retries"] = attempt
+            try:
+                result = fn()
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= retries or not self.budget.withdraw():
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                else:
+                    delay = min(delay, self.max_delay)
+                if _status_code(e) == 429:
+                    self._pause(delay)
+                else:
+                    time.sleep(delay)
+                    stats["queue_wait"] += delay
+                attempt += 1
+                continue
+            self.budget.deposit()
+            return result
+
+_schedulers: Dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(name: str) -> RequestScheduler:
+    """Mengembalikan penjadwal bersama untuk satu provider ("openai", "together", "jina")."""
+    with _schedulers_lock:
+        if name not in _schedulers:
+            rpm, tpm = DEFAULT_LIMITS.get(name, (0, 0))
+            _schedulers[name] = RequestScheduler(name, rpm, tpm)
+        return _schedulers[name]
+
+def configure_scheduler(name: str, rpm: int, tpm: int):
+    """Mengubah batas RPM/TPM provider bila berbeda dari pengaturan saat ini."""
+    scheduler = get_scheduler(name)
+    if (scheduler.rpm, scheduler.tpm) != (rpm, tpm):
+        scheduler.configure(rpm, tpm)
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """Perkiraan token yang dipakai satu permintaan completion (prompt + alokasi output)."""
+    text = request.get("prompt") or "".join(m.get("content", "") for m in request.get("messages", []))
+    return len(text) // 4 + min(request.get("max_tokens", 500), 1000)
@@ -0,0 +1,126 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from http_client import CONNECT_TIMEOUT, DEFAULT_TIMEOUT, http_get
+from llm_cache import CACHE_DIR
+from scheduler import get_scheduler
+
+# Bisa diarahkan ke server lain (mis. stub benchmark) lewat environment variable
+JINA_READER_URL = os.environ.get("JINA_READER_URL", "https://r.jina.ai")
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+# Bila salinan lama tersedia, jangan menunggu Jina lebih lama dari ini; sajikan salinan lama
+STALE_READ_TIMEOUT = 20.0
+
+def normalize_url(url: str) -> str:
+    """Menormalkan URL agar variasi penulisan yang sama memakai satu entri cache."""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not k.lower().startswith("utm_")
+    ))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+class ScrapeStore:
+    """Penyimpanan lokal (SQLite) hasil Jina Reader per URL ternormalisasi, beserta validator HTTP-nya."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrapes ("
+            " url TEXT PRIMARY KEY, content TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, etag, last_modified, fetched_at FROM scrapes WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"content": row[0], "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+
+    def put(self, url: str, content: str, etag: Optional[str], last_modified: Optional[str]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrapes (url, content, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, content, etag, last_modified, time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, url: str):
+        """Menandai entri sebagai segar kembali setelah revalidasi 304."""
+        with self._lock:
+            self._conn.execute("UPDATE scrapes SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+_store: Optional[ScrapeStore] = None
+_store_lock = threading.Lock()
+
+def get_scrape_store() -> ScrapeStore:
+    """Mengembalikan penyimpanan hasil scraping bersama untuk seluruh proses."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ScrapeStore(os.path.join(CACHE_DIR, "scrapes.sqlite3"))
+        return _store
+
+def cached_scrape(url: str, jina_api_key: str, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                  stats: Optional[Dict] = None) -> Tuple[str, str]:
+    """Mengambil halaman lewat Jina Reader dengan cache TTL dan revalidasi bersyarat.
+
+    Mengembalikan (konten, status) dengan status salah satu dari "fresh" (dari cache),
+    "revalidated" (304), "fetched" (unduhan baru) atau "stale" (Jina gagal/lambat, salinan lama dipakai).
+    Melempar requests.exceptions.RequestException bila gagal dan tidak ada salinan lama.
+    stats diteruskan ke RequestScheduler.call untuk mencatat antrean dan retry.
+    """
+    store = get_scrape_store()
+    key = normalize_url(url)
+    entry = store.get(key)
+
+    if entry is not None and time.time() - entry["fetched_at"] < ttl_seconds:
+        return entry["content"], "fresh"
+
+    headers = {"Authorization": f"Bearer {jina_api_key}"}
+    timeout = DEFAULT_TIMEOUT
+    if entry is not None:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        timeout = (CONNECT_TIMEOUT, STALE_READ_TIMEOUT)
+
+    def fetch() -> requests.Response:
+        response = http_get(f"{JINA_READER_URL}/{url}", headers=headers, timeout=timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    try:
+        # Dengan salinan lama, jangan retry: lebih cepat menyajikan salinan lama
+        response = get_scheduler("jina").call(fetch, max_retries=0 if entry is not None else None, stats=stats)
+    except requests.exceptions.RequestException:
+        if entry is not None:
+            return entry["content"], "stale"
+        raise
+
+    if response.status_code == 304 and entry is not None:
+        store.touch(key)
+        return entry["content"], "revalidated"
+
+    store.put(key, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return response.text, "fetched"
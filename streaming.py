@@ -0,0 +1,37 @@
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator
+
+import requests
+
+def iter_sse_data(response: requests.Response) -> Iterator[Dict[str, Any]]:
+    """Membaca event "data:" dari respons Server-Sent Events (format streaming Together/OpenAI)."""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+def throttle(fn: Callable[..., None], interval: float = 0.15) -> Callable[..., None]:
+    """Membatasi frekuensi pemanggilan fn (mis. render ulang UI per token).
+
+    Panggilan yang terlalu rapat dibuang; pemanggil bertanggung jawab merender hasil akhir.
+    """
+    last = [0.0]
+    lock = threading.Lock()
+
+    def wrapper(*args, **kwargs):
+        now = time.monotonic()
+        with lock:
+            if now - last[0] < interval:
+                return
+            last[0] = now
+        fn(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,214 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+_WORDS = (
+    "tindak pidana korupsi penyidik pasal ayat undang-undang unsur pelaku kerugian negara "
+    "penyalahgunaan wewenang gratifikasi suap jabatan pembuktian saksi alat bukti putusan"
+).split()
+
+class StubConfig:
+    """Perilaku satu layanan tiruan: distribusi latensi, tingkat error dan ukuran payload.
+
+    Latensi diambil dari distribusi log-normal dengan median latency_ms dan sebaran latency_sigma,
+    ditambah ms_per_token untuk setiap token keluaran. Sebagian permintaan (error_rate) dijawab
+    429 dengan Retry-After atau 500, dengan porsi 429 sebesar rate_limit_share.
+    """
+
+    def __init__(self, latency_ms: float = 200.0, latency_sigma: float = 0.5, ms_per_token: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_share: float = 0.5, retry_after: float = 0.5,
+                 page_kb: float = 20.0, answer_tokens: int = 200):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.ms_per_token = ms_per_token
+        self.error_rate = error_rate
+        self.rate_limit_share = rate_limit_share
+        self.retry_after = retry_after
+        self.page_kb = page_kb
+        self.answer_tokens = answer_tokens
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+def _words(count: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_WORDS) for _ in range(count))
+
+def fake_page(url: str, size_kb: float) -> str:
+    """Markdown tiruan berisi judul dan paragraf "pasal" yang deterministik per URL.
+
+    Seperti hasil Jina sungguhan, halaman diapit menu navigasi, gambar dan footer boilerplate.
+    """
+    seed = zlib.crc32(url.encode("utf-8"))
+    nav = "\n".join(f"* [Menu {i}](https://example.com/menu/{i})" for i in range(1, 7))
+    parts = [nav, f"# Dokumen {seed % 10_000}", f"![Logo](https://example.com/logo-{seed % 100}.png)"]
+    footer = ["Hak cipta © Contoh. Kebijakan privasi.", "Situs ini menggunakan cookie."]
+    section = 0
+    while sum(len(p) + 2 for p in parts + footer) < size_kb * 1024:
+        section += 1
+        parts.append(f"## Pasal {section}")
+        parts.append(_words(60, seed + section) + ".")
+    return "\n\n".join(parts + footer)
+
+def fake_completion(prompt: str, answer_tokens: int) -> str:
+    """Teks balasan yang bentuknya mengikuti jenis prompt pipeline (bersihkan, pertanyaan, jawaban)."""
+    seed = zlib.crc32(prompt.encode("utf-8"))
+    if prompt.startswith("Bersihkan teks"):
+        return prompt.split("\n\n", 1)[-1]
+    match = re.search(r"buatlah (\d+) pertanyaan", prompt)
+    if match:
+        return "\n".join(
+            f"{i}. Bagaimana penerapan Pasal {seed % 1000 + i} terkait {_words(6, seed + i)}?"
+            for i in range(1, int(match.group(1)) + 1)
+        )
+    match = re.search(r"Jawab ke-(\d+) pertanyaan", prompt)
+    if match:
+        answers = [{"id": i, "answer": _words(answer_tokens, seed + i)} for i in range(1, int(match.group(1)) + 1)]
+        return json.dumps({"answers": answers}, ensure_ascii=False)
+    return _words(answer_tokens, seed)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: StubConfig
+    rng: random.Random
+    counts: Dict[str, int]
+    lock: threading.Lock
+
+    def log_message(self, *args):
+        pass
+
+    def _sleep(self, output_tokens: int = 0):
+        with self.lock:
+            latency = self.rng.lognormvariate(0, self.config.latency_sigma) * self.config.latency_ms
+            failed = self.rng.random() < self.config.error_rate
+            rate_limited = self.rng.random() < self.config.rate_limit_share
+        time.sleep((latency + output_tokens * self.config.ms_per_token) / 1000)
+        return failed, rate_limited
+
+    def _send(self, status: int, body: str, content_type: str = "application/json", headers: Optional[Dict] = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _count(self, key: str):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _fail(self, rate_limited: bool):
+        self._count("errors")
+        if rate_limited:
+            self._send(429, '{"error": "rate limit"}', headers={"Retry-After": str(self.config.retry_after)})
+        else:
+            self._send(500, '{"error": "internal"}')
+
+    def do_GET(self):
+        self._count("jina")
+        failed, rate_limited = self._sleep()
+        if failed:
+            return self._fail(rate_limited)
+        self._send(200, fake_page(self.path.lstrip("/"), self.config.page_kb), "text/plain; charset=utf-8")
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        chat = self.path.rstrip("/").endswith("/chat/completions")
+        self._count("openai" if chat else "together")
+        prompt = request["messages"][-1]["content"] if chat else request.get("prompt", "")
+        text = fake_completion(prompt, self.config.answer_tokens)
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        failed, rate_limited = self._sleep(usage["completion_tokens"])
+        if failed:
+            return self._fail(rate_limited)
+        if request.get("stream"):
+            return self._send_stream(request, text, usage, chat)
+        if chat:
+            body = {
+                "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": request.get("model"),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+                "usage": usage,
+            }
+        else:
+            body = {"id": "stub", "choices": [{"index": 0, "text": text, "finish_reason": "stop"}], "usage": usage}
+        self._send(200, json.dumps(body, ensure_ascii=False))
+
+    def _send_stream(self, request: Dict, text: str, usage: Dict, chat: bool):
+        """Respons Server-Sent Events per potongan kata, diakhiri usage dan "data: [DONE]"."""
+        pieces = re.findall(r"\S+\s*|\s+", text) or [""]
+        events = []
+        for piece in pieces:
+            if chat:
+                events.append({
+                    "id": "stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": request.get("model"),
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                })
+            else:
+                events.append({"id": "stub", "choices": [{"index": 0, "text": piece, "finish_reason": None}]})
+        if chat:
+            # Seperti OpenAI: usage hanya dikirim bila diminta, dalam chunk terakhir tanpa choices
+            if (request.get("stream_options") or {}).get("include_usage"):
+                events.append({
+                    "id": "stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": request.get("model"), "choices": [], "usage": usage,
+                })
+        else:
+            events[-1]["usage"] = usage
+        body = "".join(f"data: {json.dumps(event, ensure_ascii=False)}\n\n" for event in events) + "data: [DONE]\n\n"
+        self._send(200, body, "text/event-stream")
+
+def start_stub(config: StubConfig, seed: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Menjalankan satu server tiruan di thread latar; mengembalikan (server, base URL)."""
+    handler = type("StubHandler", (_Handler,), {
+        "config": config, "rng": random.Random(seed), "counts": {}, "lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def stub_environment(jina_url: str, llm_url: str) -> Dict[str, str]:
+    """Environment variable yang mengarahkan Jina, Together dan OpenAI ke server tiruan."""
+    return {
+        "JINA_READER_URL": jina_url,
+        "TOGETHER_COMPLETIONS_URL": f"{llm_url}/v1/completions",
+        "OPENAI_BASE_URL": f"{llm_url}/v1",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Menjalankan server tiruan Jina Reader dan API LLM untuk pengujian lokal.")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--ms-per-token", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--page-kb", type=float, default=20.0)
+    parser.add_argument("--answer-tokens", type=int, default=200)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms, latency_sigma=args.latency_sigma, ms_per_token=args.ms_per_token,
+        error_rate=args.error_rate, page_kb=args.page_kb, answer_tokens=args.answer_tokens,
+    )
+    _, jina_url = start_stub(config, seed=1)
+    _, llm_url = start_stub(config, seed=2)
+    print("Server tiruan berjalan. Jalankan aplikasi dengan environment berikut:")
+    for key, value in stub_environment(jina_url, llm_url).items():
+        print(f"export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+from answering import parse_batch_answers
+
+def test_maps_answers_by_id():
+    content = '{"answers": [{"id": 2, "answer": " Dua. "}, {"id": 1, "answer": "Satu."}]}'
+    assert parse_batch_answers(content, 2) == ["Satu.", "Dua."]
+
+def test_strips_code_fence_and_surrounding_text():
+    content = 'Berikut jawabannya:\n```json\n{"answers": [{"id": 1, "answer": "Satu."}]}\n```'
+    assert parse_batch_answers(content, 1) == ["Satu."]
+
+def test_missing_empty_and_invalid_items_are_none():
+    content = (
+        '{"answers": [{"id": 1, "answer": ""}, {"id": "x", "answer": "Rusak."}, {"id": 9, "answer": "Di luar."},'
+        ' "bukan objek", {"id": "3", "answer": "Tiga."}]}'
+    )
+    assert parse_batch_answers(content, 3) == [None, None, "Tiga."]
+
+def test_unparseable_response_is_all_none():
+    assert parse_batch_answers(None, 2) == [None, None]
+    assert parse_batch_answers("Maaf, saya tidak bisa menjawab.", 2) == [None, None]
+    assert parse_batch_answers('{"answers": [{"id": 1, "answer": "Satu."}', 2) == [None, None]
+    assert parse_batch_answers('{"answers": {"id": 1}}', 1) == [None]
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from backends import HEDGE_MIN_SAMPLES, Backend, LLMRouter, build_router, get_latency_tracker, required_providers
+
+class FakeBackend(Backend):
+    """Backend tanpa jaringan: replies[prompt] berisi (detik, jawaban atau exception)."""
+
+    def __init__(self, provider: str, model: str, replies=None):
+        self.provider = provider
+        super().__init__(model)
+        self.replies = replies or {}
+        self.calls = []
+        self.finished = threading.Event()
+
+    def build_request(self, prompt, system, temperature, max_tokens, json_mode):
+        return {"model": self.model, "prompt": prompt}
+
+    def send(self, request, call, on_token):
+        self.calls.append(request["prompt"])
+        delay, reply = self.replies.get(request["prompt"], (0.0, f"{self.provider}:{request['prompt']}"))
+        time.sleep(delay)
+        self.finished.set()
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+def hedged_router(model: str, primary_replies=None, alternate_replies=None, p95: float = 0.05):
+    """Router dengan hedge aktif dan ambang p95 primary yang sudah terisi."""
+    primary = FakeBackend("together", model, primary_replies)
+    alternate = FakeBackend("openai", model, alternate_replies)
+    for _ in range(HEDGE_MIN_SAMPLES):
+        get_latency_tracker().record(primary.name, "answers", p95)
+    return LLMRouter({}, primary, [primary, alternate], hedge=True, use_cache=False), primary, alternate
+
+def test_no_hedge_before_enough_latency_samples():
+    primary = FakeBackend("together", "cold", {"q": (0.2, "lambat")})
+    alternate = FakeBackend("openai", "cold")
+    router = LLMRouter({}, primary, [primary, alternate], hedge=True, use_cache=False)
+    assert router.complete("answers", "q") == "lambat"
+    assert alternate.calls == []
+
+def test_fast_primary_is_not_hedged():
+    router, primary, alternate = hedged_router("fast")
+    assert router.complete("answers", "q") == "together:q"
+    assert alternate.calls == []
+
+def test_first_success_wins():
+    router, primary, alternate = hedged_router("slow-primary", primary_replies={"q": (0.5, "lambat")})
+    started = time.monotonic()
+    assert router.complete("answers", "q") == "openai:q"
+    assert time.monotonic() - started < 0.4
+    assert primary.calls == ["q"] and alternate.calls == ["q"]
+    primary.finished.wait(1)
+
+def test_falls_back_when_first_result_fails():
+    router, primary, alternate = hedged_router(
+        "failing-alternate",
+        primary_replies={"q": (0.3, "jawaban primary")},
+        alternate_replies={"q": (0.0, ValueError("gagal"))},
+    )
+    assert router.complete("answers", "q") == "jawaban primary"
+
+def test_falls_back_when_first_result_is_empty():
+    router, primary, alternate = hedged_router(
+        "empty-primary",
+        primary_replies={"q": (0.1, None)},
+        alternate_replies={"q": (0.2, "jawaban alternatif")},
+    )
+    assert router.complete("answers", "q") == "jawaban alternatif"
+
+def test_raises_when_both_fail():
+    router, primary, alternate = hedged_router(
+        "both-fail",
+        primary_replies={"q": (0.1, ValueError("primary"))},
+        alternate_replies={"q": (0.0, ValueError("alternatif"))},
+    )
+    with pytest.raises(ValueError):
+        router.complete("answers", "q")
+
+def test_streaming_calls_are_not_hedged():
+    router, primary, alternate = hedged_router("stream", primary_replies={"q": (0.2, "lambat")})
+    tokens = []
+    assert router.complete("answers", "q", on_token=tokens.append) == "lambat"
+    assert alternate.calls == [] and tokens == ["lambat"]
+
+def test_routes_pick_backend_per_stage():
+    default = FakeBackend("together", "route")
+    clean = FakeBackend("openai", "route")
+    router = LLMRouter({"clean": clean}, default, use_cache=False)
+    assert router.complete("clean", "q") == "openai:q"
+    assert router.complete("answers", "q") == "together:q"
+
+def test_required_providers_skip_unused_default():
+    routes = {"clean": "together", "questions": "together", "answers": "together:model-lain"}
+    assert required_providers(routes, "openai") == {"together"}
+    assert required_providers({"clean": "together"}, "openai") == {"together", "openai"}
+
+def test_build_router_needs_only_used_keys():
+    routes = {"clean": "together", "questions": "together", "answers": "together"}
+    router = build_router({"together": "k", "openai": ""}, routes, "openai")
+    assert router.default is None
+    assert router.backend_for("answers").provider == "together"
+    with pytest.raises(ValueError):
+        build_router({"together": "k", "openai": ""}, {"clean": "together"}, "openai")
+
+def test_backend_requires_request_and_send():
+    class Incomplete(Backend):
+        provider = "together"
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,72 @@
+import tracemalloc
+
+from batch import process_urls
+from checkpoints import CheckpointStore
+
+PAGE_CHARS = 1_000_000
+
+def peak_memory(url_count: int) -> int:
+    """Puncak memori process_urls untuk url_count halaman 1 MB dengan fungsi tahap tiruan."""
+    urls = [f"https://example.com/{i}" for i in range(url_count)]
+    tracemalloc.start()
+    try:
+        process_urls(
+            urls,
+            # Setiap halaman objek string baru, seperti hasil scraping sungguhan
+            scrape_fn=lambda url: (url + " ") * (PAGE_CHARS // (len(url) + 1)),
+            clean_fn=lambda text: text.upper(),
+            questions_fn=lambda document: ["Apa isi pasal 1?"],
+            answer_fn=lambda question, document: "Jawaban.",
+            stage_workers={"scrape": 1, "clean": 1, "questions": 1, "answers": 1},
+            on_record=lambda record: None,
+        )
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_peak_memory_does_not_grow_with_url_count():
+    small, large = peak_memory(20), peak_memory(60)
+    # Hanya URL yang sedang berada di pipeline (dibatasi antrean) yang menyimpan teks halamannya
+    assert large < small * 1.5
+    assert large < 20 * 2 * PAGE_CHARS
+
+def test_resume_skips_finished_stages_and_answers(tmp_path):
+    checkpoints = CheckpointStore(str(tmp_path), namespace="test")
+    urls = ["https://example.com/a", "https://example.com/b"]
+    asked = []
+    failing = {("Halaman https://example.com/a", "Siapa pelaku?")}
+
+    def answer(question: str, document: str):
+        asked.append(question)
+        # Gagal di run pertama sehingga tidak tersimpan di checkpoint dan dicoba ulang saat dilanjutkan
+        if (document, question) in failing:
+            return None
+        return f"Jawaban: {question}"
+
+    def run(**stages):
+        return process_urls(
+            urls,
+            answer_fn=answer,
+            stage_workers={"scrape": 1, "clean": 1, "questions": 1, "answers": 1},
+            answer_concurrency=1,
+            checkpoints=checkpoints,
+            **stages,
+        )
+
+    first = run(
+        scrape_fn=lambda url: f"Halaman {url}",
+        clean_fn=lambda text: text,
+        questions_fn=lambda document: ["Apa isi pasal 1?", "Siapa pelaku?"],
+    )
+    assert len(first) == 3
+
+    def not_called(*args):
+        raise AssertionError("tahap yang sudah tersimpan di checkpoint dijalankan ulang")
+
+    asked.clear()
+    failing.clear()
+    resumed = run(scrape_fn=not_called, clean_fn=not_called, questions_fn=not_called)
+    assert asked == ["Siapa pelaku?"]
+    assert [(row["Sumber URL"], row["Pertanyaan"]) for row in resumed] == [
+        (url, question) for url in urls for question in ["Apa isi pasal 1?", "Siapa pelaku?"]
+    ]
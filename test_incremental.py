@@ -0,0 +1,37 @@
+from incremental import SectionDiff, section_hash
+
+PAGE = (
+    "# Pasal 2\n\nSetiap orang yang secara melawan hukum memperkaya diri sendiri dipidana penjara.\n\n"
+    "# Pasal 3\n\nSetiap orang yang menyalahgunakan kewenangan karena jabatan dipidana penjara.\n\n"
+    "# Pasal 5\n\nSetiap orang yang memberi sesuatu kepada pegawai negeri dipidana penjara."
+)
+
+def test_without_known_hashes_everything_is_new():
+    diff = SectionDiff(PAGE)
+    assert diff.is_full
+    assert diff.changed == [0, 1, 2]
+    assert diff.delta_text() == PAGE
+
+def test_only_changed_sections_are_processed():
+    known = SectionDiff(PAGE).hashes
+    updated = PAGE.replace("memberi sesuatu", "memberi atau menjanjikan sesuatu")
+    diff = SectionDiff(updated, known)
+    assert diff.changed == [2]
+    assert diff.unchanged_hashes() == known[:2]
+    assert diff.delta_text().startswith("# Pasal 5") and "menjanjikan" in diff.delta_text()
+
+def test_whitespace_only_edits_are_not_changes():
+    known = SectionDiff(PAGE).hashes
+    diff = SectionDiff(PAGE.replace("dipidana penjara.", "dipidana  penjara. "), known)
+    assert diff.changed == []
+    assert section_hash("# Pasal 2\n\nIsi  pasal.") == section_hash("# Pasal 2\n\nIsi pasal.")
+
+def test_changed_from_checkpoint_is_reused():
+    diff = SectionDiff(PAGE, known=[], changed=[1])
+    assert not diff.is_full
+    assert diff.delta_text().startswith("# Pasal 3")
+
+def test_questions_are_attributed_to_best_matching_changed_section():
+    diff = SectionDiff(PAGE)
+    hashes = diff.attribute(["Apa pidana bagi yang menyalahgunakan kewenangan jabatan?", "Apa hukuman memberi sesuatu kepada pegawai negeri?"])
+    assert hashes == [diff.hashes[1], diff.hashes[2]]
@@ -0,0 +1,53 @@
+from preclean import needs_llm_cleaning, preclean
+
+NAV = "\n".join(f"* [Menu {i}](https://example.com/menu/{i})" for i in range(1, 5))
+FOOTER = "Hak cipta © 2024 Contoh. All rights reserved.\n\nSitus ini menggunakan cookie.\n\n[Masuk](https://example.com/login)"
+
+DASAR_HUKUM = (
+    "## Dasar Hukum\n\n"
+    "1. [Undang-Undang Nomor 31 Tahun 1999 tentang Pemberantasan Tindak Pidana Korupsi](https://example.com/uu-31-1999)\n"
+    "2. [Undang-Undang Nomor 20 Tahun 2001 tentang Perubahan atas UU 31/1999](https://example.com/uu-20-2001)\n"
+    "3. [Undang-Undang Nomor 30 Tahun 2002 tentang Komisi Pemberantasan Tindak Pidana Korupsi](https://example.com/uu-30-2002)"
+)
+
+def page(body: str) -> str:
+    return f"Title: Contoh\n\nURL Source: https://example.com/a\n\nMarkdown Content:\n{NAV}\n\n{body}\n\n{NAV}\n\n{FOOTER}"
+
+def test_keeps_hak_cipta_statutes():
+    body = (
+        "## Pasal 113 UU Hak Cipta\n\n"
+        "Pasal 113 ayat (3) UU Hak Cipta mengancam pidana penjara paling lama 4 tahun bagi pelanggar hak ekonomi.\n\n"
+        "Syarat dan ketentuan perjanjian fidusia wajib didaftarkan."
+    )
+    cleaned, report = preclean(page(body))
+    assert "## Pasal 113 UU Hak Cipta" in cleaned
+    assert "Pasal 113 ayat (3) UU Hak Cipta mengancam pidana" in cleaned
+    assert "Syarat dan ketentuan perjanjian fidusia wajib didaftarkan." in cleaned
+    assert "©" not in cleaned and "cookie" not in cleaned and "Masuk" not in cleaned
+    assert report["boilerplate_lines"] == 3
+
+def test_keeps_dasar_hukum_list_inside_body():
+    body = f"Korupsi diatur dalam beberapa undang-undang yang saling melengkapi.\n\n{DASAR_HUKUM}\n\nKetiganya masih berlaku hingga saat ini bagi penegak hukum."
+    cleaned, _ = preclean(page(body))
+    assert "1. Undang-Undang Nomor 31 Tahun 1999 tentang Pemberantasan Tindak Pidana Korupsi" in cleaned
+    assert "2. Undang-Undang Nomor 20 Tahun 2001" in cleaned
+    assert "3. Undang-Undang Nomor 30 Tahun 2002" in cleaned
+    assert "https://" not in cleaned
+
+def test_keeps_dasar_hukum_list_at_end_of_article():
+    body = f"Korupsi diatur dalam beberapa undang-undang yang saling melengkapi.\n\n{DASAR_HUKUM}"
+    cleaned, _ = preclean(page(body))
+    assert cleaned.endswith("3. Undang-Undang Nomor 30 Tahun 2002 tentang Komisi Pemberantasan Tindak Pidana Korupsi")
+
+def test_drops_edge_and_repeated_menus():
+    body = "# Judul\n\nIsi artikel ini cukup panjang untuk dianggap paragraf.\n\n" + NAV.replace("Menu", "Tautan") + "\n\nParagraf penutup artikel ini juga cukup panjang."
+    cleaned, report = preclean(page(body))
+    assert "Menu" not in cleaned
+    assert "Tautan 1" in cleaned
+    assert report["nav_lines"] == 8
+
+def test_clean_page_skips_llm_in_auto_mode():
+    cleaned, report = preclean(page("# Judul\n\nIsi artikel ini cukup panjang untuk dianggap paragraf."))
+    assert cleaned == "# Contoh\n\n# Judul\n\nIsi artikel ini cukup panjang untuk dianggap paragraf."
+    assert not needs_llm_cleaning(report, "auto")
+    assert needs_llm_cleaning(report, "llm")
@@ -0,0 +1,39 @@
+from question_dedup import QuestionIndex, dedupe_questions, strip_preamble
+
+def test_drops_near_duplicates_and_keeps_order():
+    questions = [
+        "1. Apa unsur tindak pidana korupsi menurut Pasal 2 UU Tipikor?",
+        "2. Apa saja unsur tindak pidana korupsi menurut Pasal 2 UU Tipikor?",
+        "3. Bagaimana langkah penyidik dalam mengumpulkan alat bukti?",
+    ]
+    kept, dropped = dedupe_questions(questions)
+    assert kept == [questions[0], questions[2]]
+    assert dropped == [questions[1]]
+
+def test_different_article_numbers_are_not_duplicates():
+    questions = [
+        "Apa unsur tindak pidana korupsi menurut Pasal 2 UU Tipikor?",
+        "Apa unsur tindak pidana korupsi menurut Pasal 3 UU Tipikor?",
+    ]
+    assert dedupe_questions(questions) == (questions, [])
+
+def test_strip_preamble_keeps_only_questions():
+    lines = ["Berikut 2 pertanyaan hukum:", "", "1. Apa itu gratifikasi?", "2. Siapa yang berwenang menyidik?"]
+    assert strip_preamble(lines) == ["1. Apa itu gratifikasi?", "2. Siapa yang berwenang menyidik?"]
+
+def test_index_drops_questions_seen_for_other_urls(tmp_path):
+    path = str(tmp_path / "questions.sqlite3")
+    question = "Apa unsur tindak pidana korupsi menurut Pasal 2 UU Tipikor?"
+    index = QuestionIndex(path)
+    assert index.filter("https://example.com/a", [question]) == ([question], [])
+    # Menjalankan ulang URL yang sama tetap menghasilkan pertanyaan
+    assert index.filter("https://example.com/a", [question]) == ([question], [])
+    assert index.filter("https://example.com/b", [question]) == ([], [question])
+    assert index.filter("https://example.com/b", [question], use_history=False) == ([question], [])
+
+    # Riwayat tersimpan di SQLite dan dimuat ulang oleh indeks baru
+    reopened = QuestionIndex(path)
+    assert len(reopened) == 2
+    assert reopened.filter("https://example.com/c", [question]) == ([], [question])
+    reopened.clear()
+    assert len(reopened) == 0
@@ -0,0 +1,93 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from scheduler import RequestScheduler, RetryBudget, TokenBucket, configure_scheduler, get_scheduler
+
+def test_reconfigure_to_unlimited_releases_waiting_call():
+    scheduler = RequestScheduler("test", rpm=600, tpm=60)
+    scheduler.tokens.acquire(60)
+    outcome = {}
+
+    def call():
+        try:
+            outcome["result"] = scheduler.call(lambda: "ok", estimated_tokens=30)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=call)
+    thread.start()
+    time.sleep(0.1)
+    # TPM 0 = tanpa batas; permintaan yang sedang menunggu langsung lewat, bukan ZeroDivisionError
+    scheduler.configure(60, 0)
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    assert outcome == {"result": "ok"}
+
+def test_resize_keeps_current_level():
+    bucket = TokenBucket(60)
+    bucket.acquire(50)
+    bucket.resize(120)
+    assert bucket.capacity == 120
+    assert 10 <= bucket.tokens < 11
+
+class FakeHTTPError(Exception):
+    def __init__(self, status: int, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+def flaky(*errors):
+    """fn untuk scheduler.call yang melempar errors berurutan lalu berhasil."""
+    remaining = list(errors)
+
+    def fn():
+        if remaining:
+            raise remaining.pop(0)
+        return "ok"
+
+    return fn
+
+def test_unlimited_bucket_never_waits():
+    bucket = TokenBucket(0)
+    assert bucket.acquire(10_000) == 0.0
+
+def test_request_larger_than_capacity_passes_once_bucket_is_full():
+    bucket = TokenBucket(60)
+    assert bucket.acquire(1_000) == 0.0
+
+def test_retry_after_pauses_the_provider():
+    scheduler = RequestScheduler("test", rpm=0, tpm=0, base_delay=0.01)
+    stats = {}
+    started = time.monotonic()
+    assert scheduler.call(flaky(FakeHTTPError(429, {"retry-after-ms": "200"})), stats=stats) == "ok"
+    assert time.monotonic() - started >= 0.2
+    assert stats["retries"] == 1 and stats["attempts"] == 2
+    assert stats["queue_wait"] >= 0.15
+
+def test_non_retryable_error_is_raised_immediately():
+    scheduler = RequestScheduler("test", rpm=0, tpm=0, base_delay=0.01)
+    with pytest.raises(FakeHTTPError):
+        scheduler.call(flaky(FakeHTTPError(400), FakeHTTPError(400)))
+
+def test_gives_up_after_max_retries():
+    scheduler = RequestScheduler("test", rpm=0, tpm=0, max_retries=2, base_delay=0.001)
+    with pytest.raises(FakeHTTPError):
+        scheduler.call(flaky(*[FakeHTTPError(503)] * 3))
+    assert scheduler.call(flaky(*[FakeHTTPError(503)] * 2)) == "ok"
+
+def test_retry_budget_limits_retries():
+    budget = RetryBudget(ratio=0.5, minimum=2)
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+def test_configure_scheduler_only_changes_limits():
+    scheduler = get_scheduler("test-configure")
+    configure_scheduler("test-configure", 30, 1_000)
+    assert (scheduler.rpm, scheduler.tpm) == (30, 1_000)
+    assert scheduler.requests.capacity == 30 and scheduler.tokens.capacity == 1_000